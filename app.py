@@ -1,10 +1,47 @@
-from gui.main_window import TAManagementSystem
+import time
+
+STARTED = time.perf_counter()
+
+import threading
 import tkinter as tk
+from tkinter import messagebox
+
+# The window is shown before pandas and the rest of the app are imported;
+# those load on a worker thread and the UI is built once they are in.
+IMPORT_POLL_MS = 20
+
+
+def import_app(loaded):
+    try:
+        from gui.main_window import TAManagementSystem
+        loaded['app'] = TAManagementSystem
+    except Exception as e:
+        loaded['error'] = e
+
 
 def main():
     root = tk.Tk()
-    app = TAManagementSystem(root)
+    root.title("TA Candidate Management System")
+    root.geometry("1400x800")
+    splash = tk.Label(root, text="Loading...")
+    splash.pack(expand=True)
+    loaded = {}
+    thread = threading.Thread(target=import_app, args=(loaded,), name='import', daemon=True)
+    thread.start()
+
+    def poll():
+        if thread.is_alive():
+            root.after(IMPORT_POLL_MS, poll)
+            return
+        if 'error' in loaded:
+            messagebox.showerror("Error", f"Failed to start: {loaded['error']}")
+            root.destroy()
+            return
+        splash.destroy()
+        loaded['app'](root, started=STARTED)
+
+    root.after(IMPORT_POLL_MS, poll)
     root.mainloop()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
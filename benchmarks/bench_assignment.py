@@ -0,0 +1,55 @@
+"""Assignment solver time and quality on synthetic pools.
+
+Each size is CANDIDATESxSECTIONS. Sections meet once or twice a week in
+75-minute slots and take 1-3 TAs; 60% of candidates are busy in up to eight
+slots. Weights are uniform in 1..10. The exact (min-cost flow) solver also
+runs where it is affordable, so the greedy result can be compared to the
+optimum.
+
+    python -m benchmarks.bench_assignment 200x20 1000x50 2000x500 50000x500
+"""
+import random
+import sys
+
+import numpy as np
+
+from services.assignment import EXACT_LIMIT, Problem, Section, solve
+
+DAYS = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri']
+SLOTS = [(day, start, start + 75) for day in DAYS for start in range(8 * 60, 18 * 60, 90)]
+
+
+def synthetic(candidates, sections, seed=0):
+    rng = random.Random(seed)
+    section_list = [Section(f"S{i}", rng.randint(1, 3), rng.sample(SLOTS, rng.randint(1, 2)))
+                    for i in range(sections)]
+    ids = [f"c{i}" for i in range(candidates)]
+    weights = np.array([rng.uniform(1, 10) for _ in ids])
+    busy = {candidate_id: rng.sample(SLOTS, rng.randint(1, 8)) for candidate_id in ids if rng.random() < 0.6}
+    return ids, weights, busy, section_list
+
+
+def main(argv):
+    sizes = [tuple(int(part) for part in arg.lower().split('x')) for arg in argv] \
+        or [(200, 20), (150, 80), (1000, 50), (2000, 500), (10000, 100), (50000, 500)]
+    print(f"{'candidates':>10}  {'sections':>8}  {'seats':>6}  {'method':>6}  {'time (s)':>8}  "
+          f"{'filled':>6}  {'weight':>10}  {'of exact':>8}")
+    for candidates, sections in sizes:
+        ids, weights, busy, section_list = synthetic(candidates, sections)
+        seats = sum(section.capacity for section in section_list)
+        problem = Problem(ids, weights, busy, section_list)
+        methods = ['greedy']
+        if seats * problem.edges() <= 10 * EXACT_LIMIT:
+            methods.insert(0, 'exact')
+        optimum = None
+        for method in methods:
+            result = solve(ids, weights, busy, section_list, method=method)
+            if method == 'exact':
+                optimum = result.weight
+            ratio = f"{result.weight / optimum:.4f}" if optimum else '-'
+            print(f"{candidates:>10}  {sections:>8}  {seats:>6}  {method:>6}  {result.seconds:>8.3f}  "
+                  f"{result.seats():>6}  {result.weight:>10.1f}  {ratio:>8}")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,45 @@
+"""Memory per candidate with and without compact storage.
+
+Each size is a synthetic form export (see benchmarks.synthetic). Bytes are
+the table's deep memory_usage plus, in compact mode, the compressed text
+store.
+
+    python -m benchmarks.bench_memory 1000 10000 100000
+"""
+import sys
+import time
+
+from benchmarks.synthetic import generate
+from models.candidate import BUCKETS, CandidateManager
+from models.compact import table_nbytes
+
+
+def measure(df, compact):
+    manager = CandidateManager(compact=compact)
+    start = time.perf_counter()
+    manager.begin_import()
+    manager.append_candidates(df.copy())
+    manager.finish_import()
+    elapsed = time.perf_counter() - start
+    ids = list(manager.members['Available'])
+    manager.decide_many(ids[::9], 'Hire')
+    manager.dismiss_many(ids[1::7])
+    table = table_nbytes(manager.table) + manager.text_store.nbytes()
+    # Tab views are copies of their rows, so they count too
+    views = sum(table_nbytes(manager.bucket(name)) for name in BUCKETS)
+    return table / len(df), views / len(df), elapsed
+
+
+def main(argv):
+    sizes = [int(arg) for arg in argv] or [1000, 10000, 100000]
+    print(f"{'rows':>8}  {'mode':>8}  {'table B/cand':>12}  {'views B/cand':>12}  {'import (s)':>10}")
+    for size in sizes:
+        df = generate(size)
+        for compact in (False, True):
+            table, views, elapsed = measure(df, compact)
+            mode = 'compact' if compact else 'plain'
+            print(f"{size:>8}  {mode:>8}  {table:>12.0f}  {views:>12.0f}  {elapsed:>10.3f}")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
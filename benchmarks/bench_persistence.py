@@ -0,0 +1,93 @@
+"""State save/load benchmark across storage backends.
+
+Each save and load runs in a fresh interpreter so peak RSS can be read from
+getrusage; the reported RSS is the growth of the peak during the operation.
+
+    python -m benchmarks.bench_persistence 1000 10000 100000
+"""
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from benchmarks.synthetic import generate
+from models.candidate import CandidateManager
+from services.persistence import load_state, save_state, set_typed_table, typed_table
+
+FORMATS = ['json', 'sqlite', 'parquet']
+
+
+def peak_rss_mb():
+    # ru_maxrss is KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def build_manager(size):
+    df = generate(size)
+    manager = CandidateManager()
+    manager.set_state({'Available': df})
+    ids = list(manager.members['Available'])
+    manager.dismiss_many(ids[::7])
+    manager.decide_many(ids[1::11], 'Hire')
+    manager.score_many(ids[2::5], 8.0)
+    return manager
+
+
+def worker(op, source, target):
+    manager = CandidateManager()
+    if op == 'save':
+        set_typed_table(manager, pd.read_pickle(source))
+        before = peak_rss_mb()
+        start = time.perf_counter()
+        save_state(manager, target)
+    else:
+        before = peak_rss_mb()
+        start = time.perf_counter()
+        load_state(manager, source)
+    elapsed = time.perf_counter() - start
+    print(json.dumps({'seconds': elapsed, 'rss_mb': peak_rss_mb() - before}))
+
+
+def run_worker(*args):
+    out = subprocess.run([sys.executable, '-m', 'benchmarks.bench_persistence', '--worker', *args],
+                         check=True, capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def available_formats():
+    formats = list(FORMATS)
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        formats.remove('parquet')
+    return formats
+
+
+def main(argv):
+    if argv and argv[0] == '--worker':
+        worker(*argv[1:])
+        return
+    sizes = [int(arg) for arg in argv] or [1000, 10000, 100000]
+    formats = available_formats()
+    print(f"{'rows':>8}  {'format':>8}  {'save (s)':>9}  {'save RSS MB':>11}  "
+          f"{'load (s)':>9}  {'load RSS MB':>11}  {'size MB':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            source = os.path.join(tmp, f'{size}.pkl')
+            typed_table(build_manager(size)).to_pickle(source)
+            for fmt in formats:
+                target = os.path.join(tmp, f'{size}.{fmt}')
+                saved = run_worker('save', source, target)
+                loaded = run_worker('load', target, '')
+                file_mb = os.path.getsize(target) / 1024 / 1024
+                print(f"{size:>8}  {fmt:>8}  {saved['seconds']:>9.3f}  {saved['rss_mb']:>11.1f}  "
+                      f"{loaded['seconds']:>9.3f}  {loaded['rss_mb']:>11.1f}  {file_mb:>8.1f}")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,82 @@
+"""Cold start: what stands between launching app.py and a usable window.
+
+Each step runs in a fresh interpreter so imports are cold:
+
+    app        importing app.py (all that runs before the window appears)
+    modules    importing gui.main_window (done on a worker thread)
+    state      Journal.load of a saved session into a compact manager
+    first tab  the rows and display tuples of the visible tab only
+    all tabs   the same for all six tabs, as startup used to do
+
+    python -m benchmarks.bench_startup 1000 10000 100000
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def worker(step, state_path):
+    start = time.perf_counter()
+    if step == 'app':
+        import app  # noqa: F401
+    elif step == 'modules':
+        import gui.main_window  # noqa: F401
+    else:
+        from gui.tree_model import TreeViewModel, frame_rows
+        from models.candidate import BUCKETS, CandidateManager
+        from services.journal import Journal
+        manager = CandidateManager(compact=True)
+        Journal(state_path).load(manager)
+        if step != 'state':
+            start = time.perf_counter()
+            for bucket in (BUCKETS[:1] if step == 'first_tab' else BUCKETS):
+                view = manager.bucket(bucket)
+                # Large tabs only render a screenful (see TreeViewModel)
+                if len(view) > TreeViewModel.VIRTUAL_THRESHOLD:
+                    view = view.iloc[:50]
+                frame_rows(view)
+    print(json.dumps({'seconds': time.perf_counter() - start}))
+
+
+def run_worker(*args):
+    out = subprocess.run([sys.executable, '-m', 'benchmarks.bench_startup', '--worker', *args],
+                         check=True, capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])['seconds']
+
+
+def build_state(size, state_path):
+    from benchmarks.synthetic import generate
+    from models.candidate import CandidateManager
+    from services.persistence import save_state
+    manager = CandidateManager()
+    manager.set_state({'Available': generate(size)})
+    ids = list(manager.members['Available'])
+    manager.dismiss_many(ids[::7])
+    manager.decide_many(ids[1::11], 'Hire')
+    save_state(manager, state_path)
+
+
+def main(argv):
+    if argv and argv[0] == '--worker':
+        worker(*argv[1:])
+        return
+    sizes = [int(arg) for arg in argv] or [1000, 10000, 100000]
+    print(f"{'app (s)':>8}  {'modules (s)':>11}")
+    print(f"{run_worker('app', ''):>8.3f}  {run_worker('modules', ''):>11.3f}")
+    print()
+    print(f"{'rows':>8}  {'state (s)':>9}  {'first tab (s)':>13}  {'all tabs (s)':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            state_path = os.path.join(tmp, f'{size}.json')
+            build_state(size, state_path)
+            state = run_worker('state', state_path)
+            first = run_worker('first_tab', state_path)
+            every = run_worker('all_tabs', state_path)
+            print(f"{size:>8}  {state:>9.3f}  {first:>13.3f}  {every:>12.3f}")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,176 @@
+"""Benchmark harness: import, search, sort, move, save and load at each size.
+
+Every size runs in a fresh interpreter on a synthetic export (see
+benchmarks.synthetic) with the GUI's settings (compact storage, chunked
+import). For each operation it records the wall time and how much it raised
+the peak RSS; peak_rss_mb is the process peak for the whole size. Results
+can be saved as a baseline and later runs compared against it; comparing
+exits with status 1 when an operation got slower (or the peak grew) by more
+than the threshold.
+
+    python -m benchmarks.run 1k 10k 100k --save baseline.json
+    python -m benchmarks.run 1k 10k 100k --compare baseline.json
+    python -m benchmarks.run 1M
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import write_csv
+
+FORMATS = ['json', 'sqlite']
+CHUNK_ROWS = 5000
+# Differences below this are noise whatever the ratio
+MIN_SECONDS = 0.005
+
+
+def parse_size(text):
+    text = text.strip().lower()
+    factor = {'k': 1000, 'm': 1000000}.get(text[-1:], 1)
+    return int(float(text.rstrip('km')) * factor)
+
+
+def peak_rss_mb():
+    # ru_maxrss is KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class Timer:
+    def __init__(self):
+        self.results = {}
+
+    def run(self, name, func, *args):
+        before = peak_rss_mb()
+        start = time.perf_counter()
+        result = func(*args)
+        self.results[name] = {'seconds': time.perf_counter() - start, 'rss_mb': peak_rss_mb() - before}
+        return result
+
+
+def import_csv(manager, file_path):
+    manager.begin_import()
+    from models.candidate import CSV_DTYPES
+    for chunk in pd.read_csv(file_path, chunksize=CHUNK_ROWS, dtype=CSV_DTYPES):
+        manager.append_candidates(chunk)
+    manager.finish_import()
+
+
+def single_moves(manager, ids):
+    for candidate_id in ids:
+        manager.dismiss_candidate(candidate_id)
+    for candidate_id in ids:
+        manager.restore_candidate(candidate_id)
+
+
+def worker(file_path, tmp):
+    from models.candidate import CandidateManager
+    from services.persistence import load_state, save_state
+    timer = Timer()
+    manager = CandidateManager(compact=True)
+    timer.run('import', import_csv, manager, file_path)
+    timer.run('search_first', manager.search, 'khan')
+    timer.run('search', lambda: [manager.search(query) for query in ('ali', 'computer science', '271')])
+    timer.run('fulltext_first', manager.fulltext_search, 'recursion pointers')
+    timer.run('fulltext', lambda: [manager.fulltext_search(query) for query in ('office hours', 'debug', 'python')])
+    timer.run('sort_cgpa', manager.sort_bucket, 'Available', ['Current CGPA'], [False])
+    timer.run('sort_grade_cgpa', manager.sort_bucket, 'Available', ['Grade in CS 200', 'Current CGPA'], [False, False])
+    ids = list(manager.members['Available'])
+    timer.run('move_single', single_moves, manager, ids[::max(1, len(ids) // 100)][:100])
+    timer.run('move_bulk', manager.decide_many, ids[::10], 'Hire')
+    timer.run('score_bulk', manager.score_many, ids[1::10], 8.0)
+    for fmt in FORMATS:
+        target = os.path.join(tmp, f'state.{fmt}')
+        timer.run(f'save_{fmt}', save_state, manager, target)
+        timer.run(f'load_{fmt}', load_state, CandidateManager(compact=True), target)
+    results = timer.results
+    results['peak_rss_mb'] = peak_rss_mb()
+    print(json.dumps(results))
+
+
+def run_size(size, tmp):
+    file_path = os.path.join(tmp, f'{size}.csv')
+    write_csv(file_path, size)
+    out = subprocess.run([sys.executable, '-m', 'benchmarks.run', '--worker', file_path, tmp],
+                         check=True, capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def compare(results, baseline, threshold):
+    # [(size, operation, old, new, ratio)] slower (or bigger) than threshold x baseline
+    regressions = []
+    print(f"{'rows':>8}  {'operation':<16}  {'baseline':>9}  {'now':>9}  {'ratio':>6}")
+    for size, operations in results.items():
+        old_operations = baseline.get(size)
+        if old_operations is None:
+            continue
+        for name, now in operations.items():
+            old = old_operations.get(name)
+            if old is None:
+                continue
+            if name == 'peak_rss_mb':
+                old_value, new_value, unit = old, now, ' MB'
+                slower = new_value > old_value * threshold
+            else:
+                old_value, new_value, unit = old['seconds'], now['seconds'], ' s'
+                slower = new_value > old_value * threshold and new_value - old_value > MIN_SECONDS
+            ratio = new_value / old_value if old_value else float('inf')
+            flag = '  REGRESSION' if slower else ''
+            print(f"{size:>8}  {name:<16}  {old_value:>9.3f}  {new_value:>9.3f}{unit:<3}  {ratio:>5.2f}x{flag}")
+            if slower:
+                regressions.append((size, name, old_value, new_value, ratio))
+    return regressions
+
+
+def report(results):
+    print(f"{'rows':>8}  {'operation':<16}  {'seconds':>9}  {'RSS +MB':>8}")
+    for size, operations in results.items():
+        for name, value in operations.items():
+            if name == 'peak_rss_mb':
+                print(f"{size:>8}  {'peak RSS (MB)':<16}  {'':>9}  {value:>8.1f}")
+            else:
+                print(f"{size:>8}  {name:<16}  {value['seconds']:>9.3f}  {value['rss_mb']:>8.1f}")
+
+
+def main(argv):
+    if argv and argv[0] == '--worker':
+        worker(*argv[1:])
+        return 0
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.run')
+    parser.add_argument('sizes', nargs='*', default=['1k', '10k', '100k'], help="rows, e.g. 1k 100k 1M")
+    parser.add_argument('--save', help="write the results to this JSON baseline")
+    parser.add_argument('--compare', help="compare against a saved baseline")
+    parser.add_argument('--threshold', type=float, default=1.25, help="ratio counted as a regression")
+    args = parser.parse_args(argv)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in [parse_size(text) for text in args.sizes]:
+            results[str(size)] = run_size(size, tmp)
+    report(results)
+    if args.save:
+        meta = {'python': platform.python_version(), 'pandas': pd.__version__, 'numpy': np.__version__,
+                'machine': platform.machine(), 'date': time.strftime('%Y-%m-%d %H:%M:%S')}
+        with open(args.save, 'w') as f:
+            json.dump({'meta': meta, 'results': results}, f, indent=1)
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)['results']
+        print()
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.2f}x")
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,159 @@
+"""Synthetic form exports for benchmarks.
+
+Rows have the columns of the real Google Form export and roughly its
+distributions: CGPAs around 3.3, grades from GRADE_MAP, about a third of
+candidates with a lecture clash written in one of the ways people actually
+write them, and free-text answers assembled from a sentence bank (a few
+hundred characters, like the real "why" answers). The same size and seed
+always give the same rows.
+
+    python -m benchmarks.synthetic 100000 responses.csv
+"""
+import sys
+
+import numpy as np
+import pandas as pd
+
+from utils.grade_map import GRADE_MAP
+
+LECTURE_ATTEND = 'Would you be able to attend the lectures? MW 11 am to 12:15 pm'
+LECTURE_CLASH = ('If you expect a clash with the lecture, please specify the day and duration and timing. '
+                 'For example, Wednesday: 30 minutes, 11 am to 11:30 am.')
+LAB_ATTEND = 'Would you be able to attend the lab? Fri 2 pm to 4:50 pm'
+LAB_CLASH = ('If you have a clash with the lab, please specify the duration and timing. '
+             'For example, 30 minutes 3 pm to 3:30 pm.')
+CONFLICT = ('Mention any potential conflict of interest (Close friends, relatives, significant others). '
+            'Otherwise, write "No"')
+EXPERIENCE = 'If you have any prior experience TA\'ing, please mention which course. Otherwise, write "No"'
+WHY = 'Why do you wish to TA this course?'
+COLUMNS = ['Timestamp', 'Full name', 'Roll number', 'Current CGPA', 'If you have declared a major, please specify',
+           'Grade in CS 200', 'Grade in CS 202 (if taken)', LECTURE_ATTEND, LECTURE_CLASH, LAB_ATTEND, LAB_CLASH,
+           CONFLICT, EXPERIENCE, WHY]
+
+FIRST_NAMES = ['Muhammad', 'Ali', 'Ahmed', 'Hassan', 'Fatima', 'Ayesha', 'Zainab', 'Hamza', 'Usman', 'Maryam',
+               'Sara', 'Abdullah', 'Bilal', 'Hira', 'Omar', 'Noor', 'Saad', 'Amna', 'Zara', 'Ibrahim',
+               'Mahnoor', 'Taha', 'Huda', 'Shahzaib', 'Iqra', 'Daniyal', 'Laiba', 'Rayyan', 'Eman', 'Faris']
+LAST_NAMES = ['Khan', 'Ahmed', 'Ali', 'Hussain', 'Malik', 'Butt', 'Qureshi', 'Sheikh', 'Chaudhry', 'Raza',
+              'Iqbal', 'Siddiqui', 'Javed', 'Rehman', 'Aslam', 'Tariq', 'Nadeem', 'Saeed', 'Zafar', 'Ayub']
+MAJORS = ['Computer Science', 'CS', 'Computer Science ', 'Computer science ', 'computer science', 'BSCS',
+          'Electrical Engineering', 'EE', 'Mathematics', 'Economics', 'Physics', np.nan]
+MAJOR_WEIGHTS = [34, 12, 11, 3, 2, 2, 4, 2, 3, 2, 2, 5]
+CS200_GRADES = ['A+', 'A', 'A-', 'B+', 'B', 'B-', 'C+', 'Lower than the above']
+CS200_WEIGHTS = [6, 21, 21, 23, 5, 2, 1, 1]
+LECTURE_CLASHES = [
+    'Monday, Wednesday: 11 am to 12:15 pm', 'MW 11:00 am -12:50 pm', 'Wednesday: 30 minutes, 11 am to 11:30 am',
+    'Monday 11:30 to 12:15', 'Lecture clashes with CS225 fully but I am willing to change my section',
+    'Complete clash with OS MW 11 AM to 12:15 PM', 'Not sure yet', 'No',
+    'I will only be able to specify once I have my own weekly schedule finalized after enrollment.',
+    'I have planned my CS 225 on MW from 11 am to 12:50 pm',
+]
+LAB_CLASHES = [
+    '50 Minutes: 4 pm to 4:50 pm', '1 hour 50 minutes 2 pm to 3:50 pm', '30 minutes 3 pm to 3:30 pm',
+    '50 minutes 4 to 4 50', 'No clash.', 'Currently force enrolled into Pakistan Studies Friday 4 to 5:50',
+    'If I dont get a swap for my pak studies class- 1hr 50 min, 2pm-3:50pm',
+]
+CONFLICTS = ['No', 'no', 'No ', 'one friend ', 'yes, one close friend is taking the course', 'Sports Teams']
+CONFLICT_WEIGHTS = [88, 3, 3, 2, 2, 2]
+EXPERIENCES = [
+    'I have TAed {course} during my A Levels for Teaching Circle',
+    '{course} with Dr {name} last year',
+    'I have been a TA for A-Level Mathematics for the past {years} years.',
+    "I have not TA'ed a course at LUMS. However, I'm currently a TA for an online course on Python.",
+    'Served as a coach for O/A-Level students in {course}. None at LUMS specifically.',
+]
+COURSES = ['CS 100', 'CS 200', 'CS 202', 'MATH 101', 'PHY 101', 'CHEM 101', 'Physics', 'Computer Science']
+WHY_SENTENCES = [
+    'I want to TA {course} because I believe it will help me strengthen my own understanding of core concepts.',
+    'When students come to me with their questions or bugs, I will be challenged to think from different perspectives.',
+    'Preparing and reviewing lab assignments will also reinforce my problem-solving skills.',
+    'I really enjoyed {course} when I took it and I would like to help others enjoy it too.',
+    'Overall, it is a great opportunity for personal development and improving communication.',
+    'I scored {grade} in the course and I am confident in my grasp of the material.',
+    'I have helped my friends debug their assignments throughout the semester and found it rewarding.',
+    'Teaching is something I have always been passionate about, from tutoring in school to mentoring juniors.',
+    'I am comfortable with recursion, pointers and object oriented programming in C++ and Python.',
+    'I want to give back to the department that has taught me so much over the last {years} years.',
+    'Being a TA would let me build patience and leadership, which I consider essential for my career.',
+    'I am available on Fridays and can hold office hours on most weekdays.',
+    'I believe I can explain difficult topics in simple terms, having done so in study groups.',
+    'The course was challenging for me at first, so I understand where students tend to struggle.',
+]
+
+
+def sample(rng, values, weights, size):
+    weights = np.asarray(weights, dtype=float)
+    return np.asarray(values, dtype=object)[rng.choice(len(values), size=size, p=weights / weights.sum())]
+
+
+def sentences(rng, bank, counts, fill):
+    # One answer per count: that many sentences from bank, with the
+    # {placeholders} filled from fill (arrays of per-row values)
+    picks = rng.integers(0, len(bank), size=counts.sum())
+    answers = []
+    start = 0
+    for row, count in enumerate(counts):
+        values = {key: column[row] for key, column in fill.items()}
+        answers.append(' '.join(bank[i].format(**values) for i in picks[start:start + count]))
+        start += count
+    return answers
+
+
+def generate(rows, seed=0, offset=0):
+    # A DataFrame shaped like the form export (no Interview Score/Decision/Status);
+    # roll numbers are unique for the rows offset .. offset + rows
+    rng = np.random.default_rng(seed)
+    first = rng.integers(0, len(FIRST_NAMES), size=rows)
+    last = rng.integers(0, len(LAST_NAMES), size=rows)
+    middle = rng.integers(0, len(FIRST_NAMES), size=rows)
+    names = [f"{FIRST_NAMES[a]} {FIRST_NAMES[b]} {LAST_NAMES[c]}" if b % 3 == 0 else f"{FIRST_NAMES[a]} {LAST_NAMES[c]}"
+             for a, b, c in zip(first, middle, last)]
+    years = rng.choice([25, 26, 27, 28], size=rows, p=[0.1, 0.3, 0.35, 0.25])
+    roll = [f"{year}{100000 + offset + i:06d}" for i, year in enumerate(years)]
+    seconds = rng.integers(0, 20 * 24 * 3600, size=rows)
+    timestamps = (pd.Timestamp('2025-07-01') + pd.to_timedelta(np.sort(seconds), unit='s')).strftime('%d/%m/%Y %H:%M:%S')
+    cgpa = np.round(np.clip(rng.normal(3.3, 0.4, size=rows), 1.5, 4.0), 2)
+
+    cs202 = sample(rng, list(GRADE_MAP)[:9] + [np.nan], [1, 1, 8, 18, 6, 3, 1, 1, 1, 41], rows)
+    attend_lecture = np.where(rng.random(rows) < 0.66, 'Yes', 'No')
+    lecture_clash = sample(rng, LECTURE_CLASHES, [3, 2, 2, 2, 1, 1, 2, 2, 1, 1], rows)
+    lecture_clash[(attend_lecture == 'Yes') & (rng.random(rows) < 0.9)] = np.nan
+    attend_lab = np.where(rng.random(rows) < 0.93, 'Yes', 'No')
+    lab_clash = sample(rng, LAB_CLASHES, [2, 2, 2, 1, 2, 1, 1], rows)
+    lab_clash[(attend_lab == 'Yes') & (rng.random(rows) < 0.85)] = np.nan
+
+    fill = {
+        'course': sample(rng, COURSES, [1] * len(COURSES), rows),
+        'grade': sample(rng, CS200_GRADES[:4], [1, 1, 1, 1], rows),
+        'years': rng.integers(1, 4, size=rows),
+        'name': [LAST_NAMES[i] for i in rng.integers(0, len(LAST_NAMES), size=rows)],
+    }
+    experience = np.array(sentences(rng, EXPERIENCES, np.ones(rows, dtype=int), fill), dtype=object)
+    experience[rng.random(rows) < 0.8] = 'No'
+
+    return pd.DataFrame({
+        'Timestamp': timestamps,
+        'Full name': names,
+        'Roll number': roll,
+        'Current CGPA': cgpa,
+        'If you have declared a major, please specify': sample(rng, MAJORS, MAJOR_WEIGHTS, rows),
+        'Grade in CS 200': sample(rng, CS200_GRADES, CS200_WEIGHTS, rows),
+        'Grade in CS 202 (if taken)': cs202,
+        LECTURE_ATTEND: attend_lecture,
+        LECTURE_CLASH: lecture_clash,
+        LAB_ATTEND: attend_lab,
+        LAB_CLASH: lab_clash,
+        CONFLICT: sample(rng, CONFLICTS, CONFLICT_WEIGHTS, rows),
+        EXPERIENCE: experience,
+        WHY: sentences(rng, WHY_SENTENCES, rng.integers(1, 9, size=rows), fill),
+    }, columns=COLUMNS)
+
+
+def write_csv(file_path, rows, seed=0, chunk=100000):
+    # Written in chunks (each its own seed) so 1M-row files don't need 1M rows in memory
+    for start in range(0, rows, chunk):
+        df = generate(min(chunk, rows - start), seed + start, offset=start)
+        df.to_csv(file_path, mode='w' if start == 0 else 'a', header=start == 0, index=False)
+
+
+if __name__ == '__main__':
+    write_csv(sys.argv[2], int(sys.argv[1]))
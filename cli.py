@@ -0,0 +1,332 @@
+import argparse
+import sys
+
+# Headless counterpart of app.py: the same state file and services, without
+# Tk. pandas and the models are imported inside the commands so that --help
+# and argument errors return immediately.
+#
+#     python cli.py import responses.csv
+#     python cli.py filter "`Current CGPA` >= 3.5" --columns name,cgpa
+#     python cli.py decide Hire 27100168 28100092
+#     python cli.py report
+#     python cli.py serve                # share the pool with other reviewers
+
+STATE_FILE = 'ta_management_state.json'
+CHUNK_ROWS = 10000
+
+
+def open_state(args, columns=None):
+    # columns: read only these form columns (commands that don't save)
+    from models.candidate import CandidateManager
+    from services.journal import Journal
+    manager = CandidateManager()
+    journal = Journal(args.state)
+    # The snapshot plus anything the GUI journaled after it
+    journal.load(manager, columns)
+    return manager, journal
+
+
+def resolve_column(manager, name):
+    # Exact column name, or a case-insensitive part of exactly one column
+    columns = list(manager.table.columns)
+    if name in columns:
+        return name
+    matches = [col for col in columns if name.lower() in col.lower()]
+    if len(matches) != 1:
+        found = ', '.join(matches) if matches else 'no column'
+        raise SystemExit(f"error: '{name}' matches {found}")
+    return matches[0]
+
+
+def resolve_columns(manager, names):
+    return [resolve_column(manager, name.strip()) for name in names.split(',') if name.strip()]
+
+
+def resolve_bucket(name):
+    from models.candidate import BUCKETS
+    for bucket in BUCKETS:
+        if bucket.lower() == name.lower():
+            return bucket
+    raise SystemExit(f"error: unknown bucket '{name}' (one of: {', '.join(BUCKETS)})")
+
+
+def output(path):
+    return sys.stdout if path in (None, '-') else open(path, 'w', newline='')
+
+
+def write_csv(df, out, header=True):
+    # In slices so a large export never holds its whole text form in memory
+    for start in range(0, max(len(df), 1), CHUNK_ROWS):
+        df.iloc[start:start + CHUNK_ROWS].to_csv(out, header=header and start == 0, index=False)
+
+
+def cmd_import(args):
+    import pandas as pd
+    from models.candidate import CSV_DTYPES
+    manager, journal = open_state(args)
+    counts = {'added': 0, 'updated': 0, 'unchanged': 0}
+    if not args.merge:
+        manager.begin_import()
+    for chunk in pd.read_csv(args.csv, chunksize=args.chunksize, dtype=CSV_DTYPES):
+        if args.merge:
+            for name, count in manager.merge_candidates(chunk).items():
+                counts[name] += count
+        else:
+            manager.append_candidates(chunk)
+            counts['added'] += len(chunk)
+    manager.finish_import()
+    journal.save(manager)
+    print(f"{counts['added']} new, {counts['updated']} updated, {counts['unchanged']} unchanged")
+
+
+def cmd_filter(args):
+    import pandas as pd
+    from models.candidate import CSV_DTYPES
+    out = output(args.output)
+    if args.csv:
+        # Straight from a CSV, one chunk at a time, without touching the state
+        first = True
+        for chunk in pd.read_csv(args.csv, chunksize=args.chunksize, dtype=CSV_DTYPES):
+            rows = chunk[chunk.eval(args.rule).fillna(False).astype(bool)]
+            write_csv(rows, out, header=first)
+            first = False
+    else:
+        manager, _ = open_state(args)
+        ids = manager.select(args.rule, resolve_bucket(args.bucket))
+        if args.columns:
+            df = manager.expanded(manager.table.loc[ids, resolve_columns(manager, args.columns)])
+            write_csv(df, out)
+        else:
+            for candidate_id in ids:
+                out.write(f"{candidate_id}\n")
+    if out is not sys.stdout:
+        out.close()
+
+
+def cmd_sort(args):
+    manager, journal = open_state(args)
+    columns = [resolve_column(manager, name) for name in args.columns]
+    manager.sort_bucket(resolve_bucket(args.bucket), columns, [not args.desc] * len(columns))
+    journal.save(manager)
+
+
+def parse_weights(text):
+    from services.ranking import DEFAULT_WEIGHTS
+    weights = dict(DEFAULT_WEIGHTS)
+    for item in (text or '').split(','):
+        if not item.strip():
+            continue
+        name, _, value = item.partition('=')
+        name = name.strip()
+        if name not in DEFAULT_WEIGHTS:
+            raise SystemExit(f"error: unknown weight '{name}' (one of: {', '.join(DEFAULT_WEIGHTS)})")
+        weights[name] = float(value)
+    return weights
+
+
+def cmd_rank(args):
+    from services.ranking import Ranker
+    from services.sorting import sort_order
+    manager, _ = open_state(args)
+    bucket = resolve_bucket(args.bucket)
+    columns = [resolve_column(manager, name) for name in args.columns]
+    scores = None
+    if columns:
+        ids = list(manager.members[bucket])
+        keys = [manager.sort_key(col).reindex(ids).to_numpy() for col in columns]
+        top = [ids[i] for i in sort_order(keys, [args.asc] * len(columns))[:args.top]]
+    else:
+        ranked = Ranker(manager, parse_weights(args.weights)).top(args.top, bucket)
+        top = [candidate_id for candidate_id, _ in ranked]
+        scores = [round(score, 4) for _, score in ranked]
+    shown = [col for col in ('Full name',) if col in manager.table.columns] + columns
+    df = manager.expanded(manager.table.loc[top, shown])
+    df.insert(0, 'id', top)
+    if scores is not None:
+        df['score'] = scores
+    out = output(args.output)
+    write_csv(df, out)
+    if out is not sys.stdout:
+        out.close()
+
+
+def cmd_decide(args):
+    manager, journal = open_state(args)
+    target = resolve_bucket(args.target)
+    ids = list(args.ids)
+    missing = [candidate_id for candidate_id in ids if candidate_id not in manager.table.index]
+    if missing:
+        raise SystemExit(f"error: unknown candidate ids: {', '.join(missing)}")
+    if args.where:
+        ids += manager.select(args.where, resolve_bucket(args.bucket))
+    # An id given explicitly may match --where as well
+    ids = list(dict.fromkeys(ids))
+    manager.move(ids, target)
+    journal.save(manager)
+    print(f"{len(ids)} candidate(s) -> {target}")
+
+
+def cmd_export(args):
+    from services.persistence import typed_table
+    manager, _ = open_state(args)
+    if args.bucket:
+        df = manager.expanded(manager.bucket(resolve_bucket(args.bucket)))
+    else:
+        df = typed_table(manager)
+    out = output(args.output)
+    write_csv(df, out)
+    if out is not sys.stdout:
+        out.close()
+
+
+def cmd_schedule(args):
+    from services.schedule import SESSIONS, ScheduleIndex, format_time
+    manager, _ = open_state(args)
+    bucket = resolve_bucket(args.bucket) if args.bucket else None
+    index = ScheduleIndex(manager)
+    for session in args.sessions or list(SESSIONS):
+        if session not in SESSIONS:
+            raise SystemExit(f"error: unknown session '{session}' (one of: {', '.join(SESSIONS)})")
+        full = index.available(session, bucket=bucket)
+        if args.list:
+            for candidate_id in full:
+                print(candidate_id)
+            continue
+        print(f"{session}: {len(full)} can attend all of it")
+        for day, start, end, free in index.slot_counts(session, args.step, bucket):
+            print(f"  {day} {format_time(start):>8} - {format_time(end):>8}  {free:>7} free")
+
+
+def cmd_assign(args):
+    from services.assignment import assignment_frame, candidates_from_manager, load_sections, solve
+    from services.ranking import Ranker
+    from services.schedule import ScheduleIndex
+    manager, _ = open_state(args)
+    buckets = [resolve_bucket(name.strip()) for name in args.buckets.split(',') if name.strip()]
+    sections = load_sections(args.sections)
+    ids, weights, busy = candidates_from_manager(manager, Ranker(manager, parse_weights(args.weights)),
+                                                 ScheduleIndex(manager), buckets)
+    result = solve(ids, weights, busy, sections, max_load=args.max_load, method=args.method,
+                   time_limit=args.time_limit)
+    out = output(args.output)
+    write_csv(assignment_frame(result, manager), out)
+    if out is not sys.stdout:
+        out.close()
+    seats = sum(section.capacity for section in sections)
+    print(f"{result.seats()} of {seats} seats filled, weight {result.weight:.2f} "
+          f"({result.method}, {result.seconds:.2f} s)", file=sys.stderr)
+
+
+def cmd_report(args):
+    import pandas as pd
+    from models.candidate import BUCKETS
+    manager, _ = open_state(args, ['Interview Score', 'Current CGPA'])
+    table = manager.table
+    print(f"{'bucket':<12}  {'count':>7}  {'scored':>7}  {'mean score':>10}  {'mean CGPA':>9}")
+    for bucket in BUCKETS:
+        ids = list(manager.members[bucket])
+        rows = table.loc[ids] if ids else table.iloc[:0]
+        scores = pd.to_numeric(rows.get('Interview Score', pd.Series(dtype=float)), errors='coerce')
+        cgpa = pd.to_numeric(rows.get('Current CGPA', pd.Series(dtype=float)), errors='coerce')
+        mean_score = f"{scores.mean():.2f}" if scores.notna().any() else '-'
+        mean_cgpa = f"{cgpa.mean():.2f}" if cgpa.notna().any() else '-'
+        print(f"{bucket:<12}  {len(ids):>7}  {int(scores.notna().sum()):>7}  {mean_score:>10}  {mean_cgpa:>9}")
+    print(f"{'total':<12}  {len(table):>7}")
+
+
+def cmd_serve(args):
+    from services.state_server import StateServer
+    server = StateServer(args.state, host=args.host, port=args.port)
+    print(f"Serving {args.state} at {server.url} (Ctrl+C to stop)", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='cli.py', description="TA selection without the GUI")
+    parser.add_argument('--state', default=STATE_FILE,
+                        help="state file (.json, .sqlite/.db or .parquet; default %(default)s)")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    p = commands.add_parser('import', help="load a form export CSV (replaces the pool unless --merge)")
+    p.add_argument('csv')
+    p.add_argument('--merge', action='store_true', help="merge new and edited responses, keeping scores and decisions")
+    p.add_argument('--chunksize', type=int, default=CHUNK_ROWS)
+    p.set_defaults(func=cmd_import)
+
+    p = commands.add_parser('filter', help="candidates matching a pandas query expression")
+    p.add_argument('rule', help="e.g. \"`Current CGPA` >= 3.5\" (backticks around column names)")
+    p.add_argument('--bucket', default='Available')
+    p.add_argument('--columns', help="comma-separated columns to print as CSV (default: ids only)")
+    p.add_argument('--csv', help="filter this CSV chunk by chunk instead of the state")
+    p.add_argument('--chunksize', type=int, default=CHUNK_ROWS)
+    p.add_argument('--output', '-o', help="file to write (default stdout)")
+    p.set_defaults(func=cmd_filter)
+
+    p = commands.add_parser('sort', help="reorder a bucket and save it")
+    p.add_argument('columns', nargs='+')
+    p.add_argument('--desc', action='store_true')
+    p.add_argument('--bucket', default='Available')
+    p.set_defaults(func=cmd_sort)
+
+    p = commands.add_parser('rank', help="top candidates by weighted score, or by the given columns (best first)")
+    p.add_argument('columns', nargs='*')
+    p.add_argument('--weights', help="e.g. cgpa=1,interview=3,lab_clash=0 (see services/ranking.py)")
+    p.add_argument('--asc', action='store_true', help="lowest first (column ranking only)")
+    p.add_argument('--top', type=int, default=20)
+    p.add_argument('--bucket', default='Available')
+    p.add_argument('--output', '-o')
+    p.set_defaults(func=cmd_rank)
+
+    p = commands.add_parser('decide', help="move candidates to a decision (or Dismissed/Available)")
+    p.add_argument('target')
+    p.add_argument('ids', nargs='*')
+    p.add_argument('--where', help="also every candidate in --bucket matching this rule")
+    p.add_argument('--bucket', default='Available')
+    p.set_defaults(func=cmd_decide)
+
+    p = commands.add_parser('export', help="write candidates to CSV")
+    p.add_argument('output', nargs='?', default='-')
+    p.add_argument('--bucket', help="only this bucket (default: everyone, with _bucket/_position)")
+    p.set_defaults(func=cmd_export)
+
+    p = commands.add_parser('schedule', help="who can cover each session, and free TAs per time slot")
+    p.add_argument('sessions', nargs='*', help="lecture and/or lab (default both)")
+    p.add_argument('--step', type=int, default=30, help="slot length in minutes")
+    p.add_argument('--bucket', help="only this bucket (default: everyone)")
+    p.add_argument('--list', action='store_true', help="print the ids free for the whole session instead")
+    p.set_defaults(func=cmd_schedule)
+
+    p = commands.add_parser('assign', help="staff course sections from the hire buckets (max total score, no clashes)")
+    p.add_argument('sections', help="CSV with section, capacity and optionally course, meetings (e.g. \"MW 11:00-12:15\")")
+    p.add_argument('--buckets', default='Strong Hire,Hire,Weak Hire')
+    p.add_argument('--weights', help="ranking weights, as for rank")
+    p.add_argument('--max-load', type=int, default=1, help="sections per TA")
+    p.add_argument('--method', choices=['auto', 'exact', 'greedy'], default='auto')
+    p.add_argument('--time-limit', type=float, help="seconds of local search (greedy)")
+    p.add_argument('--output', '-o')
+    p.set_defaults(func=cmd_assign)
+
+    p = commands.add_parser('report', help="counts and averages per bucket")
+    p.set_defaults(func=cmd_report)
+
+    p = commands.add_parser('serve', help="share the state with several reviewers (GUI: Connect...)")
+    p.add_argument('--host', default='127.0.0.1', help="clients must also see the state directory (no authentication)")
+    p.add_argument('--port', type=int, default=8765)
+    p.set_defaults(func=cmd_serve)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        args.func(args)
+    except BrokenPipeError:
+        # Output piped into e.g. head
+        sys.stderr.close()
+
+
+if __name__ == '__main__':
+    main()
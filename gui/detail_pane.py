@@ -0,0 +1,112 @@
+import tkinter as tk
+from collections import OrderedDict
+from tkinter import ttk
+
+import pandas as pd
+
+from services.fulltext import match_spans, snippet, text_columns
+
+
+class DetailPane:
+    # Side pane showing one candidate's answers. Rendered documents are kept
+    # per candidate (and search terms) until a manager event touches that
+    # candidate, so moving through a tree only swaps the text in one widget.
+    CACHE_SIZE = 500
+
+    def __init__(self, parent, manager):
+        self.manager = manager
+        self.cache = OrderedDict()
+        self.shown = None
+        self.frame = ttk.LabelFrame(parent, text="Details")
+        self.text = tk.Text(self.frame, wrap=tk.WORD, width=50, state=tk.DISABLED)
+        scrollbar = ttk.Scrollbar(self.frame, orient=tk.VERTICAL, command=self.text.yview)
+        self.text.configure(yscrollcommand=scrollbar.set)
+        self.text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.text.tag_configure("match", background="yellow")
+        self.text.tag_configure("heading", font=("TkDefaultFont", 9, "bold"))
+        manager.listeners.append(self.on_change)
+
+    def on_change(self, entry):
+        if entry['op'] == 'reset':
+            self.cache.clear()
+            changed = True
+        elif entry['op'] in ('score', 'move'):
+            for candidate_id in entry['ids']:
+                self.cache.pop(candidate_id, None)
+            changed = self.shown is not None and self.shown[0] in entry['ids']
+        else:
+            changed = False
+        if changed and self.shown is not None:
+            candidate_id, terms = self.shown
+            self.shown = None
+            self.show(candidate_id if candidate_id in self.manager.table.index else None, terms)
+
+    def render(self, candidate_id, terms):
+        cached = self.cache.get(candidate_id)
+        if cached is not None and cached[0] == terms:
+            self.cache.move_to_end(candidate_id)
+            return cached[1]
+        candidate = self.manager.details(candidate_id)
+        title = str(candidate.get('Full name', 'Candidate'))
+        parts = []
+        headings = []
+        length = 0
+
+        def add(text, heading=False):
+            nonlocal length
+            if heading:
+                headings.append((length, length + len(text)))
+            parts.append(text)
+            length += len(text)
+
+        if terms:
+            # Snippets of the answers that matched the search
+            found = []
+            for col in text_columns(candidate.to_frame().T):
+                text = snippet(str(candidate[col]), terms) if pd.notna(candidate[col]) else None
+                if text:
+                    found.append((col, text))
+            if found:
+                add("Search matches\n", heading=True)
+                for col, text in found:
+                    add(f"[{col}] {text}\n")
+                add("\n")
+        for col in candidate.index:
+            value = candidate[col]
+            add(f"{col}\n", heading=True)
+            add(f"{'' if pd.isna(value) else value}\n\n")
+        text = ''.join(parts)
+        document = (title, text, headings, match_spans(text, terms))
+        self.cache[candidate_id] = (terms, document)
+        if len(self.cache) > self.CACHE_SIZE:
+            self.cache.popitem(last=False)
+        return document
+
+    def show(self, candidate_id, terms=()):
+        terms = tuple(terms)
+        if candidate_id is None:
+            self.clear()
+            return
+        if self.shown == (candidate_id, terms):
+            return
+        title, text, headings, spans = self.render(candidate_id, terms)
+        self.shown = (candidate_id, terms)
+        self.frame.configure(text=title)
+        self.text.configure(state=tk.NORMAL)
+        self.text.delete("1.0", tk.END)
+        self.text.insert("1.0", text)
+        for start, end in headings:
+            self.text.tag_add("heading", f"1.0 + {start} chars", f"1.0 + {end} chars")
+        for start, end in spans:
+            self.text.tag_add("match", f"1.0 + {start} chars", f"1.0 + {end} chars")
+        self.text.configure(state=tk.DISABLED)
+
+    def clear(self):
+        if self.shown is None:
+            return
+        self.shown = None
+        self.frame.configure(text="Details")
+        self.text.configure(state=tk.NORMAL)
+        self.text.delete("1.0", tk.END)
+        self.text.configure(state=tk.DISABLED)
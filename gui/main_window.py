@@ -1,28 +1,83 @@
+import sys
+import time
 import tkinter as tk
-import pandas as pd
 from tkinter import ttk, filedialog, messagebox, simpledialog
+from gui.detail_pane import DetailPane
+from gui.tree_model import TreeViewModel
 from models.candidate import CandidateManager
-from services.persistence import load_candidates_csv, save_state, load_state
-from services.sorting import sort_candidates
-from utils.grade_map import GRADE_MAP
+from models.history import History
+from services.importer import CsvImport
+from services.fulltext import tokenize
+from services.journal import Journal, StateLoad, apply_entry
+from services.ranking import FEATURE_LABELS, Ranker
+from services.schedule import SESSIONS, ScheduleIndex, format_time
+from utils.instrumentation import describe, enabled, last, record, span, timed
+
+def tree_name(key):
+    return key.lower().replace(' ', '_').replace("'", '') + '_tree'
 
 class TAManagementSystem:
-    def __init__(self, root):
+    SEARCH_DELAY_MS = 120
+    IMPORT_POLL_MS = 50
+    STATUS_POLL_MS = 250
+    REMOTE_POLL_MS = 200
+
+    def __init__(self, root, started=None):
+        # started: perf_counter() at process start, for the startup time
+        self.started = time.perf_counter() if started is None else started
         self.root = root
         self.root.title("TA Candidate Management System")
         self.root.geometry("1400x800")
 
-        self.manager = CandidateManager()
+        self.manager = CandidateManager(compact=True)
+        self.tree_models = {}
+        self.tab_buckets = {}
+        self.search_job = None
+        self.csv_import = None
+        self.import_backup = None
+        # Edits made while a finished import is compacted (see poll_import)
+        self.import_edits = None
+        self.merge_counts = None
+        self.ranker = Ranker(self.manager)
+        self.schedule = ScheduleIndex(self.manager)
+        self.rank_window = None
+        self.rank_job = None
+        self.assignment_job = None
+        self.history = History(self.manager)
+        self.state_load = None
+        # Set while sharing the pool through a state server (services/state_server.py)
+        self.state_client = None
+        # Every change is journaled and autosaved in the background
+        self.journal = Journal()
         self.create_widgets()
+        record('startup_ui', time.perf_counter() - self.started)
+        # The window is up; the saved state is read on a worker thread
         self.load_state()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.root.bind_all("<Control-z>", self.undo)
+        self.root.bind_all("<Control-y>", self.redo)
+        self.root.bind_all("<Control-Z>", self.redo)
 
     def create_widgets(self):
         # Create control bar first
         self.create_control_bar()
 
-        # Then create notebook
-        self.notebook = ttk.Notebook(self.root)
-        self.notebook.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        # Latency of the last operation, when instrumentation is on (TA_TRACE)
+        self.status_var = None
+        if enabled():
+            self.status_var = tk.StringVar()
+            ttk.Label(self.root, textvariable=self.status_var, anchor='w').pack(side=tk.BOTTOM, fill=tk.X, padx=10)
+            self.root.after(self.STATUS_POLL_MS, self.update_status)
+
+        # Then the notebook, with the details of the selected candidate beside it
+        self.panes = ttk.PanedWindow(self.root, orient=tk.HORIZONTAL)
+        self.panes.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        self.notebook = ttk.Notebook(self.panes)
+        self.panes.add(self.notebook, weight=3)
+        self.detail_pane = DetailPane(self.panes, self.manager)
+        self.panes.add(self.detail_pane.frame, weight=1)
+        # Only the visible tab is kept rendered; the others catch up when shown
+        self.notebook.bind("<<NotebookTabChanged>>", self.on_tab_changed)
         
         # Store tab indices
         self.tab_indices = {}
@@ -31,21 +86,26 @@ class TAManagementSystem:
         self.main_frame = ttk.Frame(self.notebook)
         self.notebook.add(self.main_frame, text="Available Candidates")
         self.tab_indices['main'] = self.main_frame
-        self.create_treeview(self.main_frame, "main")
-        self.create_context_menu()
+        self.register_tab('main', 'Available', self.create_treeview(self.main_frame, "main"))
 
         # Create dismissed tab
         self.dismissed_frame = ttk.Frame(self.notebook)
         self.notebook.add(self.dismissed_frame, text="Dismissed Candidates")
         self.tab_indices['dismissed'] = self.dismissed_frame
-        self.create_treeview(self.dismissed_frame, "dismissed")
+        self.register_tab('dismissed', 'Dismissed', self.create_treeview(self.dismissed_frame, "dismissed"))
 
         # Create hired tabs
         for decision in ['Strong Hire', 'Hire', 'Weak Hire', "Don't Hire"]:
             frame = ttk.Frame(self.notebook)
             self.notebook.add(frame, text=decision)
             self.tab_indices[decision] = frame
-            self.create_hired_tab(frame, decision)
+            self.register_tab(decision, decision, self.create_hired_tab(frame, decision))
+
+        self.create_context_menu()
+
+    def register_tab(self, key, bucket, model):
+        self.tab_buckets[key] = bucket
+        self.tree_models[key] = model
 
     def create_control_bar(self):
         # Create main control frame above notebook
@@ -59,11 +119,31 @@ class TAManagementSystem:
         search_entry = ttk.Entry(control_frame, textvariable=self.search_var)
         search_entry.pack(side=tk.LEFT, padx=(0, 10))
         search_entry.bind("<KeyRelease>", self.on_search_change)
+        self.fulltext_var = tk.BooleanVar()
+        ttk.Checkbutton(control_frame, text="Search answers", variable=self.fulltext_var,
+                        command=self.on_search_change).pack(side=tk.LEFT, padx=(0, 10))
 
         # Buttons
         ttk.Button(control_frame, text="Load CSV", command=self.load_csv).pack(side=tk.LEFT, padx=5)
+        ttk.Button(control_frame, text="Merge CSV", command=self.merge_csv).pack(side=tk.LEFT, padx=5)
         ttk.Button(control_frame, text="Save State", command=self.save_state).pack(side=tk.LEFT, padx=5)
         ttk.Button(control_frame, text="Load State", command=self.load_state).pack(side=tk.LEFT, padx=5)
+        self.undo_button = ttk.Button(control_frame, text="Undo", command=self.undo, state=tk.DISABLED)
+        self.undo_button.pack(side=tk.LEFT, padx=5)
+        self.redo_button = ttk.Button(control_frame, text="Redo", command=self.redo, state=tk.DISABLED)
+        self.redo_button.pack(side=tk.LEFT, padx=5)
+        ttk.Button(control_frame, text="Dismiss by Rule...", command=self.dismiss_by_rule).pack(side=tk.LEFT, padx=5)
+        ttk.Button(control_frame, text="Availability", command=self.show_availability).pack(side=tk.LEFT, padx=5)
+        ttk.Button(control_frame, text="Assign TAs...", command=self.assign_tas).pack(side=tk.LEFT, padx=5)
+        self.connect_button = ttk.Button(control_frame, text="Connect...", command=self.connect_server)
+        self.connect_button.pack(side=tk.LEFT, padx=5)
+
+        # CSV import progress, only shown while an import is running
+        self.import_frame = ttk.Frame(control_frame)
+        self.import_progress = ttk.Progressbar(self.import_frame, length=150, maximum=100)
+        self.import_progress.pack(side=tk.LEFT, padx=5)
+        ttk.Button(self.import_frame, text="Cancel", command=self.cancel_import).pack(side=tk.LEFT)
+        self.loading_label = ttk.Label(control_frame, text="Loading state...")
 
         # Sort controls
         sort_frame = ttk.LabelFrame(control_frame, text="Sort by")
@@ -77,6 +157,7 @@ class TAManagementSystem:
             ttk.Checkbutton(sort_frame, text=option, variable=var).grid(row=0, column=i, padx=5)
 
         ttk.Button(sort_frame, text="Apply Sort", command=self.apply_sort).grid(row=0, column=len(sort_options), padx=10)
+        ttk.Button(sort_frame, text="Rank...", command=self.rank_candidates).grid(row=0, column=len(sort_options) + 1, padx=(0, 10))
 
     def create_dismissed_tab(self):
         control_frame = ttk.Frame(self.dismissed_frame)
@@ -86,7 +167,7 @@ class TAManagementSystem:
 
     def create_hired_tab(self, parent_frame, decision):
         # Use the same create_treeview method for consistency
-        tree = self.create_treeview(parent_frame, decision.lower().replace(' ', '_').replace("'", ''))
+        return self.create_treeview(parent_frame, decision.lower().replace(' ', '_').replace("'", ''))
 
 
     def create_treeview(self, parent, tree_type):
@@ -95,7 +176,7 @@ class TAManagementSystem:
         container_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         
         # Create the tree and scrollbars
-        tree = ttk.Treeview(container_frame)
+        tree = ttk.Treeview(container_frame, selectmode='extended')
         
         # Create vertical scrollbar
         v_scroll = ttk.Scrollbar(container_frame, orient=tk.VERTICAL, command=tree.yview)
@@ -115,7 +196,10 @@ class TAManagementSystem:
         container_frame.grid_columnconfigure(0, weight=1)
         
         setattr(self, f"{tree_type}_tree", tree)
-        return tree
+        # The model takes over the vertical scrollbar for large, windowed tabs
+        model = TreeViewModel(tree, v_scroll, on_heading_click=self.on_treeview_column_click)
+        tree.bind('<<TreeviewSelect>>', self.show_details, add='+')
+        return model
 
     def create_context_menu(self):
         self.context_menu = tk.Menu(self.root, tearoff=0)
@@ -123,136 +207,203 @@ class TAManagementSystem:
         self.context_menu.add_command(label="Make Decision...", command=self.make_decision)
         self.context_menu.add_command(label="Dismiss Candidate...", command=self.dismiss_candidate)
         self.context_menu.add_command(label="View Details", command=self.view_details)
-        self.main_tree.bind("<Button-3>", self.show_context_menu)
+        self.main_tree.bind("<Button-3>", lambda event: self.show_context_menu(event, self.main_tree, self.context_menu))
+
+        self.dismissed_menu = tk.Menu(self.root, tearoff=0)
+        self.dismissed_menu.add_command(label="Restore Candidate", command=self.restore_candidate)
+        self.dismissed_menu.add_command(label="View Details", command=self.view_details)
+        self.dismissed_tree.bind("<Button-3>", lambda event: self.show_context_menu(event, self.dismissed_tree, self.dismissed_menu))
 
-    def show_context_menu(self, event):
+    def show_context_menu(self, event, tree, menu):
         try:
-            self.main_tree.selection_set(self.main_tree.identify_row(event.y))
-            self.context_menu.post(event.x_root, event.y_root)
+            # Right-clicking inside a multi-selection acts on the whole selection
+            row = tree.identify_row(event.y)
+            if row and row not in tree.selection():
+                tree.selection_set(row)
+            menu.post(event.x_root, event.y_root)
         except:
             pass
 
-    def load_csv(self):
+    def load_csv(self, merge=False):
+        if self.csv_import is not None or self.assignment_job is not None or self.state_load is not None:
+            return
+        if self.state_client is not None:
+            messagebox.showinfo("Connected", "Import into the shared pool on the server (cli.py import), then reconnect")
+            return
         file_path = filedialog.askopenfilename(
-            title="Select CSV file",
+            title="Select CSV file to merge" if merge else "Select CSV file",
             filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
         )
-        if file_path:
-            self.root.config(cursor="watch")
-        self.root.update_idletasks()
-        try:
-            self.manager.load_candidates(file_path)
-            self.refresh_treeview()
-            # messagebox.showinfo("Success", f"Loaded candidates from CSV.")
-        finally:
-            # Restore default cursor
-            self.root.config(cursor="")
-            self.root.update_idletasks()
-            # self.manager.load_candidates(file_path)
-            # self.refresh_treeview()
-            # messagebox.showinfo("Success", f"Loaded candidates from CSV.")
+        if not file_path:
+            return
+        # Parse on a worker thread; rows appear as each chunk arrives
+        self.import_backup = self.manager.snapshot()
+        if merge:
+            self.merge_counts = {'added': 0, 'updated': 0, 'unchanged': 0}
+        else:
+            self.manager.begin_import()
+        self.refresh_treeview()
+        self.csv_import = CsvImport(file_path).start()
+        self.import_progress['value'] = 0
+        self.import_frame.pack(side=tk.LEFT, padx=10)
+        self.root.after(self.IMPORT_POLL_MS, self.poll_import)
+
+    def merge_csv(self):
+        # A newer export of the form: new and edited responses are merged in,
+        # scores and decisions are kept
+        self.load_csv(merge=True)
+
+    def poll_import(self):
+        csv_import = self.csv_import
+        if csv_import is None:
+            return
+        finished = False
+        for message in csv_import.poll():
+            kind = message[0]
+            try:
+                if kind == 'chunk':
+                    with span('import_chunk'):
+                        if self.merge_counts is not None:
+                            for name, count in self.manager.merge_candidates(message[1]).items():
+                                self.merge_counts[name] += count
+                        else:
+                            self.manager.append_candidates(message[1])
+                    self.import_progress['value'] = message[2] * 100
+                elif kind == 'done':
+                    # Compacted on the worker; edits made here meanwhile are
+                    # collected and replayed on the result
+                    self.import_edits = []
+                    self.manager.listeners.append(self.import_edits.append)
+                    csv_import.compact(self.manager.snapshot())
+                elif kind == 'compacted':
+                    self.manager.listeners.remove(self.import_edits.append)
+                    edits, self.import_edits = self.import_edits, None
+                    self.manager.finish_import(message[1])
+                    for entry in edits:
+                        apply_entry(self.manager, entry)
+            except Exception as e:
+                # Rows the manager can't take end the import like a read error
+                csv_import.cancel()
+                kind, message = 'error', ('error', e)
+            if kind == 'compacted':
+                if self.merge_counts is not None:
+                    counts = self.merge_counts
+                    messagebox.showinfo("Merge CSV", f"{counts['added']} new, {counts['updated']} updated, "
+                                                     f"{counts['unchanged']} unchanged")
+                finished = True
+            elif kind == 'error':
+                self.manager.restore(self.import_backup)
+                messagebox.showerror("Error", f"Failed to load CSV: {str(message[1])}")
+                finished = True
+            if finished:
+                break
+        if finished:
+            self.end_import()
+        else:
+            self.root.after(self.IMPORT_POLL_MS, self.poll_import)
+        self.refresh_treeview()
+
+    def cancel_import(self):
+        if self.assignment_job is not None:
+            # The progress bar is shared with a running assignment
+            self.assignment_job.cancel()
+            self.assignment_job = None
+            self.import_frame.pack_forget()
+            return
+        if self.csv_import is None:
+            return
+        self.csv_import.cancel()
+        self.manager.restore(self.import_backup)
+        self.end_import()
+        self.refresh_treeview()
 
+    def end_import(self):
+        if self.import_edits is not None:
+            self.manager.listeners.remove(self.import_edits.append)
+            self.import_edits = None
+        self.csv_import = None
+        self.import_backup = None
+        self.merge_counts = None
+        self.import_frame.pack_forget()
+
+    def update_status(self):
+        entry = last()
+        if entry is not None:
+            self.status_var.set(describe(entry))
+        self.root.after(self.STATUS_POLL_MS, self.update_status)
+
+    @timed('refresh_treeview')
     def refresh_treeview(self):
-        # Clear all treeviews
-        for tree_name in ['main_tree', 'dismissed_tree']:
-            if hasattr(self, tree_name):
-                tree = getattr(self, tree_name)
-                for item in tree.get_children():
-                    tree.delete(item)
-
-        # Function to filter dataframe based on search
-        def filter_df(df):
-            if hasattr(self, "search_var"):
-                search = self.search_var.get().strip().lower()
-                if search:
-                    name_col = None
-                    id_col = None
-                    for col in df.columns:
-                        if "name" in col.lower():
-                            name_col = col
-                        if "roll" in col.lower() or "id" in col.lower():
-                            id_col = col
-                    if name_col or id_col:
-                        mask = pd.Series([False] * len(df))
-                        if name_col:
-                            mask = mask | df[name_col].astype(str).str.lower().str.contains(search)
-                        if id_col:
-                            mask = mask | df[id_col].astype(str).str.lower().str.contains(search)
-                        return df[mask]
-            return df
-
-        # Filter and populate main view
-        df = filter_df(self.manager.candidates)
-        if not df.empty:
-            self.setup_tree_columns(self.main_tree, df)
-            self.populate_tree(self.main_tree, df)
-
-        # Filter and populate dismissed view
-        df = filter_df(self.manager.dismissed_candidates)
-        if not df.empty:
-            self.setup_tree_columns(self.dismissed_tree, df)
-            self.populate_tree(self.dismissed_tree, df)
-
-        # Filter and populate hired views
-        for decision in ['Strong Hire', 'Hire', 'Weak Hire', "Don't Hire"]:
-            tree_name = f"{decision.lower().replace(' ', '_').replace("'", '')}_tree"
-            if hasattr(self, tree_name):
-                tree = getattr(self, tree_name)
-                for item in tree.get_children():
-                    tree.delete(item)
-                df = filter_df(self.manager.hired_candidates[decision])
-                if not df.empty:
-                    self.setup_tree_columns(tree, df)
-                    self.populate_tree(tree, df)
+        self.search_job = None
+        search = self.search_var.get().strip().lower() if hasattr(self, "search_var") else ''
+        fulltext = bool(search) and self.fulltext_var.get()
+        ranks = None
+        if fulltext:
+            # Answer search shows matches best first
+            ranked = self.manager.fulltext_search(search)
+            ranks = {candidate_id: rank for rank, (candidate_id, _) in enumerate(ranked)}
+            matches = ranks.keys()
+        else:
+            matches = self.manager.search(search)
+        current = self.get_current_key()
+        for key, model in self.tree_models.items():
+            if key != current:
+                continue
+            bucket = self.tab_buckets[key]
+            # Tabs whose rows and search text are unchanged are not touched
+            token = (self.manager.revisions[bucket], search, fulltext)
+            if token == model.token:
+                continue
+            df = self.manager.bucket(bucket)
+            ids = df.index.to_series()
+            if matches is not None:
+                mask = ids.isin(matches)
+                df = df[mask]
+                ids = ids[mask]
+            if ranks is not None:
+                order = ids.map(ranks).to_numpy().argsort(kind='stable')
+                df = df.iloc[order]
+                ids = ids.iloc[order]
+            model.sync(ids, df, token)
 
         self.update_tab_labels()  # Update tab labels after refreshing treeviews
+        self.update_history_buttons()
+        self.show_details()
 
-    def setup_tree_columns(self, tree, df):
-        tree['columns'] = ()
-        available_cols = list(df.columns)
-        # display_cols = self.manager.display_columns
-        # available_cols = [col for col in display_cols if col in df.columns]
-        tree['columns'] = available_cols
-        tree['show'] = 'headings'
-        for col in available_cols:
-            # tree.heading(col, text=col)
-            tree.heading(col, text=col, command=lambda _col=col, _tree=tree: self.on_treeview_column_click(_tree, _col))
-            tree.column(col, width=120)
-
-    def populate_tree(self, tree, df):
-        df = df.fillna('')  # Replace NaN with empty string
-        for idx, row in df.iterrows():
-            values = []
-            for col in tree['columns']:
-                val = row.get(col, '')
-                if hasattr(val, 'isna') and val.isna():
-                    val = ''
-                values.append(str(val))
-            tree.insert('', 'end', values=values, tags=(str(idx),))
-
-    def get_selected_candidate_index(self, tree):
-        selection = tree.selection()
+    def on_tab_changed(self, event=None):
+        if event is not None and event.widget is not self.notebook:
+            return
+        self.refresh_treeview()
+
+    def tree_key(self, tree):
+        for key, model in self.tree_models.items():
+            if model.tree is tree:
+                return key
+        return None
+
+    def get_selected_candidate_id(self, tree):
+        # Tree items are keyed by candidate id
+        selection = self.get_selected_candidate_ids(tree)
         if not selection:
             return None
-        item = selection[0]
-        tags = tree.item(item, 'tags')
-        if tags:
-            return int(tags[0])
-        return None
+        return selection[0]
+
+    def get_selected_candidate_ids(self, tree):
+        return self.tree_models[self.tree_key(tree)].selected_ids()
 
     def add_interview_score(self):
-        idx = self.get_selected_candidate_index(self.main_tree)
-        if idx is None:
+        candidate_ids = self.get_selected_candidate_ids(self.main_tree)
+        if not candidate_ids:
             messagebox.showwarning("Warning", "Please select a candidate")
             return
         score = simpledialog.askfloat("Interview Score", "Enter interview score (0-10):", minvalue=0, maxvalue=10)
         if score is not None:
-            self.manager.add_interview_score(idx, score)
+            self.manager.score_many(candidate_ids, score)
             self.refresh_treeview()
 
     def make_decision(self):
-        idx = self.get_selected_candidate_index(self.main_tree)
-        if idx is None:
+        candidate_ids = self.get_selected_candidate_ids(self.main_tree)
+        if not candidate_ids:
             messagebox.showwarning("Warning", "Please select a candidate")
             return
         decision_window = tk.Toplevel(self.root)
@@ -268,67 +419,169 @@ class TAManagementSystem:
         def apply_decision():
             decision = decision_var.get()
             if decision:
-                self.manager.make_decision(idx, decision)
+                self.manager.decide_many(candidate_ids, decision)
                 self.refresh_treeview()
                 decision_window.destroy()
-                messagebox.showinfo("Success", f"Candidate marked as '{decision}'")
+                messagebox.showinfo("Success", f"{self.describe_count(candidate_ids)} marked as '{decision}'")
         ttk.Button(decision_window, text="Apply", command=apply_decision).pack(pady=20)
 
     def dismiss_candidate(self):
-        idx = self.get_selected_candidate_index(self.main_tree)
-        if idx is None:
+        candidate_ids = self.get_selected_candidate_ids(self.main_tree)
+        if not candidate_ids:
             messagebox.showwarning("Warning", "Please select a candidate")
             return
-        self.manager.dismiss_candidate(idx)
+        self.manager.dismiss_many(candidate_ids)
         self.refresh_treeview()
-        messagebox.showinfo("Success", "Candidate dismissed")
+        messagebox.showinfo("Success", f"{self.describe_count(candidate_ids)} dismissed")
 
     def restore_candidate(self):
-        idx = self.get_selected_candidate_index(self.dismissed_tree)
-        if idx is None:
+        candidate_ids = self.get_selected_candidate_ids(self.dismissed_tree)
+        if not candidate_ids:
             messagebox.showwarning("Warning", "Please select a candidate")
             return
-        self.manager.restore_candidate(idx)
+        self.manager.restore_many(candidate_ids)
         self.refresh_treeview()
-        messagebox.showinfo("Success", "Candidate restored")
+        messagebox.showinfo("Success", f"{self.describe_count(candidate_ids)} restored")
+
+    def dismiss_by_rule(self):
+        rule = simpledialog.askstring(
+            "Dismiss by Rule",
+            "Dismiss available candidates matching (column names in backticks):\n"
+            "e.g. `Would you be able to attend the lab? Fri 2 pm to 4:50 pm` == 'No' and `Current CGPA` < 3.0",
+            parent=self.root)
+        if not rule:
+            return
+        try:
+            candidate_ids = self.manager.select(rule)
+        except Exception as e:
+            messagebox.showerror("Error", f"Invalid rule: {str(e)}")
+            return
+        if not candidate_ids:
+            messagebox.showinfo("Dismiss by Rule", "No candidates match this rule")
+            return
+        if messagebox.askyesno("Dismiss by Rule", f"Dismiss {self.describe_count(candidate_ids)}?"):
+            self.manager.dismiss_many(candidate_ids)
+            self.refresh_treeview()
+
+    def show_availability(self):
+        # Free TAs per half hour of each session, among the current tab
+        key = self.get_current_key()
+        bucket = self.tab_buckets[key] if key else None
+        lines = [f"Candidates in '{bucket}'\n" if bucket else '']
+        for name in SESSIONS:
+            full = self.schedule.available(name, bucket=bucket)
+            lines.append(f"{name.capitalize()}: {self.describe_count(full)} can attend all of it")
+            for day, start, end, free in self.schedule.slot_counts(name, 30, bucket):
+                lines.append(f"    {day} {format_time(start)} - {format_time(end)}: {free} free")
+            lines.append('')
+        messagebox.showinfo("Availability", '\n'.join(lines))
+
+    def assign_tas(self):
+        # Staff the sections listed in a CSV from the hire buckets. The solver
+        # runs on a worker thread with a snapshot of the inputs.
+        if self.assignment_job is not None or self.csv_import is not None:
+            return
+        from services.assignment import AssignmentJob, candidates_from_manager, load_sections
+        file_path = filedialog.askopenfilename(
+            title="Select sections CSV",
+            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
+        )
+        if not file_path:
+            return
+        try:
+            sections = load_sections(file_path)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to load sections: {str(e)}")
+            return
+        ids, weights, busy = candidates_from_manager(self.manager, self.ranker, self.schedule)
+        if not ids:
+            messagebox.showinfo("Assign TAs", "No candidates in the hire buckets yet")
+            return
+        self.assignment_job = AssignmentJob(ids, weights, busy, sections).start()
+        self.import_progress['value'] = 0
+        self.import_frame.pack(side=tk.LEFT, padx=10)
+        self.root.after(self.IMPORT_POLL_MS, self.poll_assignment)
+
+    def poll_assignment(self):
+        job = self.assignment_job
+        if job is None:
+            return
+        for kind, value in job.poll():
+            if kind == 'progress':
+                self.import_progress['value'] = value * 100
+                continue
+            self.assignment_job = None
+            self.import_frame.pack_forget()
+            if kind == 'done':
+                self.show_assignment(value)
+            elif kind == 'error':
+                messagebox.showerror("Error", f"Assignment failed: {str(value)}")
+            return
+        self.root.after(self.IMPORT_POLL_MS, self.poll_assignment)
+
+    def show_assignment(self, result):
+        from services.assignment import assignment_frame
+        df = assignment_frame(result, self.manager)
+        window = tk.Toplevel(self.root)
+        window.title("TA Assignment")
+        window.transient(self.root)
+        ttk.Label(window, text=f"{result.seats()} seats filled, total weight {result.weight:.2f} "
+                               f"({result.method}, {result.seconds:.2f} s)").pack(padx=10, pady=5)
+        tree = ttk.Treeview(window, columns=list(df.columns), show='headings')
+        for col in df.columns:
+            tree.heading(col, text=col)
+        for row in df.itertuples(index=False):
+            tree.insert('', tk.END, values=list(row))
+        tree.pack(fill=tk.BOTH, expand=True, padx=10)
+
+        def export():
+            file_path = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=[("CSV files", "*.csv")])
+            if file_path:
+                df.to_csv(file_path, index=False)
+
+        ttk.Button(window, text="Export...", command=export).pack(pady=10)
+
+    def describe_count(self, candidate_ids):
+        count = len(candidate_ids)
+        return "1 candidate" if count == 1 else f"{count} candidates"
 
     def view_details(self):
-        idx = self.get_selected_candidate_index(self.main_tree)
-        if idx is None:
+        if self.get_current_tree() is None or self.current_candidate_id() is None:
             messagebox.showwarning("Warning", "Please select a candidate")
             return
-        candidate = self.manager.candidates.iloc[idx]
-        details_window = tk.Toplevel(self.root)
-        details_window.title(f"Details: {candidate.get('Full name', 'Candidate')}")
-        details_window.geometry("600x400")
-        details_window.transient(self.root)
-        text_frame = ttk.Frame(details_window)
-        text_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
-        text_widget = tk.Text(text_frame, wrap=tk.WORD)
-        scrollbar = ttk.Scrollbar(text_frame, orient=tk.VERTICAL, command=text_widget.yview)
-        text_widget.configure(yscrollcommand=scrollbar.set)
-        text_widget.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        details = ""
-        for col in candidate.index:
-            details += f"{col}: {candidate[col]}\n\n"
-            # if col not in ['Status']:
-            #     details += f"{col}: {candidate[col]}\n\n"
-        text_widget.insert(tk.END, details)
-        text_widget.config(state=tk.DISABLED)
+        self.show_details()
 
-    def get_current_tree(self):
+    def current_candidate_id(self):
+        # The focused row of the current tab (where the arrow keys are), or
+        # the first selected one
+        tree = self.get_current_tree()
+        if tree is None:
+            return None
+        selection = self.get_selected_candidate_ids(tree)
+        focus = tree.focus()
+        if focus in selection:
+            return focus
+        return selection[0] if selection else None
+
+    def show_details(self, event=None):
+        if event is not None and event.widget is not self.notebook and event.widget is not self.get_current_tree():
+            return
+        terms = tokenize(self.search_var.get()) if self.fulltext_var.get() else []
+        self.detail_pane.show(self.current_candidate_id(), terms)
+
+    def get_current_key(self):
         current_tab = self.notebook.select()
         for key, frame in self.tab_indices.items():
             if str(frame) == str(current_tab):
-                if key == 'main':
-                    return self.main_tree
-                elif key == 'dismissed':
-                    return self.dismissed_tree
-                else:
-                    return getattr(self, f"{key.lower().replace(' ', '_').replace("'", '')}_tree")
+                return key
         return None
 
+    def get_current_tree(self):
+        key = self.get_current_key()
+        if key is None:
+            return None
+        return self.tree_models[key].tree
+
     def apply_sort(self):
         current_tree = self.get_current_tree()
         if not current_tree:
@@ -349,133 +602,239 @@ class TAManagementSystem:
             sort_columns.append('Interview Score')
             ascending_order.append(False)
 
-        # Get the appropriate DataFrame based on current tab
-        current_tab = self.notebook.select()
-        for key, frame in self.tab_indices.items():
-            if str(frame) == str(current_tab):
-                if key == 'main':
-                    df = self.manager.candidates
-                    if not df.empty and sort_columns:
-                        self.manager.candidates = df.sort_values(by=sort_columns, ascending=ascending_order)
-                elif key == 'dismissed':
-                    df = self.manager.dismissed_candidates
-                    if not df.empty and sort_columns:
-                        self.manager.dismissed_candidates = df.sort_values(by=sort_columns, ascending=ascending_order)
-                else:
-                    df = self.manager.hired_candidates[key]
-                    if not df.empty and sort_columns:
-                        self.manager.hired_candidates[key] = df.sort_values(by=sort_columns, ascending=ascending_order)
-                break
+        # Sort the DataFrame behind the current tab
+        with span('apply_sort'):
+            self.manager.sort_bucket(self.tab_buckets[self.get_current_key()], sort_columns, ascending_order)
+            self.refresh_treeview()
+        messagebox.showinfo("Success", "Items sorted successfully")
 
+    def rank_candidates(self):
+        # Non-modal weights editor; every change re-ranks the current tab
+        if self.rank_window is not None and self.rank_window.winfo_exists():
+            self.rank_window.lift()
+            return
+        window = tk.Toplevel(self.root)
+        window.title("Rank Candidates")
+        window.transient(self.root)
+        window.columnconfigure(1, weight=1)
+        self.rank_window = window
+        for row, (name, label) in enumerate(FEATURE_LABELS.items()):
+            ttk.Label(window, text=label).grid(row=row, column=0, sticky='w', padx=10)
+            scale = tk.Scale(window, from_=0, to=5, resolution=0.1, orient=tk.HORIZONTAL, length=200,
+                             command=lambda value, name=name: self.set_rank_weight(name, value))
+            scale.set(self.ranker.weights.get(name, 0))
+            scale.grid(row=row, column=1, sticky='ew', padx=10)
+        ttk.Button(window, text="Rank Current Tab", command=self.apply_rank).grid(
+            row=len(FEATURE_LABELS), column=0, columnspan=2, pady=10)
+
+    def set_rank_weight(self, name, value):
+        value = float(value)
+        if self.ranker.weights.get(name) == value:
+            return
+        self.ranker.weights[name] = value
+        # Dragging a slider fires constantly; rank once it settles
+        if self.rank_job is not None:
+            self.root.after_cancel(self.rank_job)
+        self.rank_job = self.root.after(self.SEARCH_DELAY_MS, self.apply_rank)
+
+    def apply_rank(self):
+        self.rank_job = None
+        key = self.get_current_key()
+        if key is None:
+            return
+        self.ranker.rank_bucket(self.tab_buckets[key])
+        self.refresh_treeview()
+
+    def undo(self, event=None):
+        if self.csv_import is not None or not self.history.can_undo():
+            return
+        self.history.undo()
+        self.refresh_treeview()
+
+    def redo(self, event=None):
+        if self.csv_import is not None or not self.history.can_redo():
+            return
+        self.history.redo()
         self.refresh_treeview()
-        messagebox.showinfo("Success", "Items sorted successfully")
+
+    def update_history_buttons(self):
+        if self.history.can_undo():
+            self.undo_button.configure(state=tk.NORMAL, text=f"Undo {self.history.label(self.history.done[-1])}")
+        else:
+            self.undo_button.configure(state=tk.DISABLED, text="Undo")
+        if self.history.can_redo():
+            self.redo_button.configure(state=tk.NORMAL, text=f"Redo {self.history.label(self.history.undone[-1])}")
+        else:
+            self.redo_button.configure(state=tk.DISABLED, text="Redo")
 
     def save_state(self):
+        if self.state_client is not None:
+            messagebox.showinfo("Connected", "The state server saves every change to the shared pool")
+            return
+        if self.state_load is not None:
+            messagebox.showinfo("Loading", "The saved state is still loading")
+            return
+        if self.journal.manager is None:
+            # The saved state could not be loaded, so nothing has been written
+            # over it since; only an explicit save replaces it
+            if not messagebox.askyesno("Save State", "The saved state could not be loaded. "
+                                                     "Replace it with the candidates shown now?"):
+                return
+            self.journal.attach(self.manager, checkpoint=False)
         try:
-            save_state(self.manager)
+            # Writes a full snapshot and truncates the journal
+            self.journal.checkpoint(wait=True)
             messagebox.showinfo("Success", "State saved successfully")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to save state: {str(e)}")
 
     def load_state(self):
+        if self.state_load is not None or self.csv_import is not None or self.state_client is not None:
+            return
+        # Snapshot plus whatever the journal recorded after it, read into a
+        # separate manager off the GUI thread and swapped in when done. The
+        # journal is drained into a snapshot first so the load sees every edit.
+        if self.journal.manager is not None:
+            try:
+                self.journal.checkpoint(wait=True)
+            except Exception as e:
+                messagebox.showerror("Error", f"Failed to save state before loading: {str(e)}")
+                return
+        self.journal.detach()
+        self.state_load = StateLoad(self.journal, self.manager.compact).start()
+        self.loading_label.pack(side=tk.LEFT, padx=10)
+        self.root.after(self.IMPORT_POLL_MS, self.poll_state_load)
+
+    def poll_state_load(self):
+        messages = self.state_load.poll()
+        if not messages:
+            self.root.after(self.IMPORT_POLL_MS, self.poll_state_load)
+            return
+        kind, value = messages[0]
+        self.state_load = None
+        self.loading_label.pack_forget()
+        if kind == 'done':
+            # A reset: views, indexes and the undo history start over
+            self.manager.restore(value)
+            self.journal.attach(self.manager)
+        else:
+            # Left detached: attaching would snapshot this manager over the
+            # file that could not be read
+            messagebox.showerror("Error", f"Failed to load state: {str(value)}\n"
+                                          "The state file is left as it is; edits are not saved until Save State")
+        self.refresh_treeview()
+        if self.started is not None:
+            self.report_startup()
+
+    def connect_server(self):
+        # Share the pool with other reviewers through a state server
+        # (cli.py serve). Edits go to the server as they are made; the other
+        # reviewers' edits are applied here as they arrive.
+        if self.state_client is not None:
+            self.disconnect_server()
+            return
+        if self.state_load is not None or self.csv_import is not None or self.assignment_job is not None:
+            return
+        from services.state_server import DEFAULT_PORT, StateClient
+        url = simpledialog.askstring("Connect", "State server URL:", parent=self.root,
+                                     initialvalue=f"http://127.0.0.1:{DEFAULT_PORT}")
+        if not url:
+            return
+        # The server's log replaces the local journal while connected
+        journaled = self.journal.manager is not None
+        self.journal.detach()
         try:
-            load_state(self.manager)
-            self.refresh_treeview()
-            # messagebox.showinfo("Success", "State loaded successfully")
+            self.state_client = StateClient(self.manager, url, self.history).connect()
         except Exception as e:
-            messagebox.showerror("Error", f"Failed to load state: {str(e)}")
+            messagebox.showerror("Error", f"Failed to connect: {str(e)}")
+            if journaled:
+                self.journal.attach(self.manager)
+            return
+        self.connect_button.configure(text="Disconnect")
+        self.refresh_treeview()
+        self.root.after(self.REMOTE_POLL_MS, self.poll_remote)
+
+    def disconnect_server(self):
+        self.state_client.close()
+        self.state_client = None
+        self.connect_button.configure(text="Connect...")
+        # Back to the local session as it was saved
+        self.load_state()
 
+    def poll_remote(self):
+        client = self.state_client
+        if client is None:
+            return
+        if client.apply_remote():
+            self.refresh_treeview()
+        if client.error is not None:
+            messagebox.showerror("Error", f"State server: {client.error}; disconnected")
+            self.disconnect_server()
+            return
+        conflicts = client.take_conflicts()
+        if conflicts:
+            messagebox.showwarning(
+                "Changed by another reviewer",
+                f"{len(conflicts)} candidate(s) were changed by another reviewer first; "
+                "your change was undone and theirs is shown")
+        self.root.after(self.REMOTE_POLL_MS, self.poll_remote)
+
+    def report_startup(self):
+        # Process start to the first tab showing the saved state
+        seconds = time.perf_counter() - self.started
+        self.started = None
+        record('startup', seconds, {'candidates': len(self.manager.table)})
+        if enabled():
+            print(f"startup: {seconds:.2f} s ({len(self.manager.table)} candidates)", file=sys.stderr)
+
+    def on_close(self):
+        if self.state_client is not None:
+            self.state_client.close()
+        self.journal.close()
+        self.root.destroy()
+
+    @timed('column_sort')
     def on_treeview_column_click(self, tree, col):
         try:
             # Determine which DataFrame to sort
-            if tree == self.main_tree:
-                df = self.manager.candidates
-                ascending = getattr(self, 'main_tree_sort_ascending', {}).get(col, True)
-                try:
-                    self.manager.candidates = df.sort_values(by=col, ascending=ascending).reset_index(drop=True)
-                except TypeError as e:
-                    # Get the problematic values and their corresponding candidate names
-                    problematic_rows = df[pd.to_numeric(df[col], errors='coerce').isna() & df[col].notna()]
-                    if not problematic_rows.empty:
-                        names = problematic_rows['Full name'].tolist()[:2]  # Get first two problematic names
-                        message = f"Cannot compare values for candidates:\n{' and '.join(names)}\n\nColumn: {col}"
-                        messagebox.showerror("Sorting Error", message)
-                        return
-                    raise e  # Re-raise if we couldn't identify the problematic rows
-                
-                self.refresh_treeview()
-                if not hasattr(self, 'main_tree_sort_ascending'):
-                    self.main_tree_sort_ascending = {}
-                self.main_tree_sort_ascending[col] = not ascending
-
-            elif tree == self.dismissed_tree:
-                df = self.manager.dismissed_candidates
-                ascending = getattr(self, 'dismissed_tree_sort_ascending', {}).get(col, True)
-                try:
-                    self.manager.dismissed_candidates = df.sort_values(by=col, ascending=ascending).reset_index(drop=True)
-                except TypeError as e:
-                    problematic_rows = df[pd.to_numeric(df[col], errors='coerce').isna() & df[col].notna()]
-                    if not problematic_rows.empty:
-                        names = problematic_rows['Full name'].tolist()[:2]
-                        message = f"Cannot compare values for candidates:\n{' and '.join(names)}\n\nColumn: {col}"
-                        messagebox.showerror("Sorting Error", message)
-                        return
-                    raise e
-
-                self.refresh_treeview()
-                if not hasattr(self, 'dismissed_tree_sort_ascending'):
-                    self.dismissed_tree_sort_ascending = {}
-                self.dismissed_tree_sort_ascending[col] = not ascending
+            key = self.tree_key(tree)
+            bucket = self.tab_buckets[key]
+            attr_name = f"{tree_name(key)}_sort_ascending"
+            ascending = getattr(self, attr_name, {}).get(col, True)
+            # Typed sort keys handle grades and mixed empty/numeric columns
+            self.manager.sort_bucket(bucket, [col], [ascending])
 
-            else:
-                # For hired trees
-                for decision in ['Strong Hire', 'Hire', 'Weak Hire', "Don't Hire"]:
-                    tree_name = f"{decision.lower().replace(' ', '_').replace("'", '')}_tree"
-                    if hasattr(self, tree_name) and tree == getattr(self, tree_name):
-                        df = self.manager.hired_candidates[decision]
-                        attr_name = f"{tree_name}_sort_ascending"
-                        ascending = getattr(self, attr_name, {}).get(col, True)
-                        try:
-                            self.manager.hired_candidates[decision] = df.sort_values(
-                                by=col, ascending=ascending).reset_index(drop=True)
-                        except TypeError as e:
-                            problematic_rows = df[pd.to_numeric(df[col], errors='coerce').isna() & df[col].notna()]
-                            if not problematic_rows.empty:
-                                names = problematic_rows['Full name'].tolist()[:2]
-                                message = f"Cannot compare values for candidates:\n{' and '.join(names)}\n\nColumn: {col}"
-                                messagebox.showerror("Sorting Error", message)
-                                return
-                            raise e
-
-                        self.refresh_treeview()
-                        if not hasattr(self, attr_name):
-                            setattr(self, attr_name, {})
-                        getattr(self, attr_name)[col] = not ascending
-                        break
+            self.refresh_treeview()
+            if not hasattr(self, attr_name):
+                setattr(self, attr_name, {})
+            getattr(self, attr_name)[col] = not ascending
 
         except Exception as e:
             messagebox.showerror("Sorting Error", 
                 f"An unexpected error occurred while sorting column '{col}':\n\n{str(e)}")
 
     def on_search_change(self, event=None):
-        self.refresh_treeview()
+        # Debounce keystrokes so a burst of typing triggers a single refresh
+        if self.search_job is not None:
+            self.root.after_cancel(self.search_job)
+        self.search_job = self.root.after(self.SEARCH_DELAY_MS, self.refresh_treeview)
 
     def update_tab_labels(self):
         # Available Candidates
-        count = len(self.manager.candidates)
+        count = len(self.manager.members['Available'])
         if count > 0:
             self.notebook.tab(self.tab_indices['main'], text=f"Available Candidates ({count})")
         else:
             self.notebook.tab(self.tab_indices['main'], text="Available Candidates")
         # Dismissed Candidates
-        count = len(self.manager.dismissed_candidates)
+        count = len(self.manager.members['Dismissed'])
         if count > 0:
             self.notebook.tab(self.tab_indices['dismissed'], text=f"Dismissed Candidates ({count})")
         else:
             self.notebook.tab(self.tab_indices['dismissed'], text="Dismissed Candidates")
         # Hired Candidates
         for decision in ['Strong Hire', 'Hire', 'Weak Hire', "Don't Hire"]:
-            count = len(self.manager.hired_candidates[decision])
+            count = len(self.manager.members[decision])
             if count > 0:
                 self.notebook.tab(self.tab_indices[decision], text=f"{decision} ({count})")
             else:
@@ -0,0 +1,269 @@
+import numpy as np
+import pandas as pd
+
+from utils.instrumentation import count, timed
+
+
+def frame_rows(df):
+    # Builds the display tuples for every row in one pass per column: each
+    # distinct value is converted to str once and NaN maps to ''.
+    columns = []
+    for col in df.columns:
+        codes, uniques = pd.factorize(df[col])
+        labels = np.empty(len(uniques) + 1, dtype=object)
+        if uniques.dtype == 'float32':
+            # Compact numbers: float32's own shortest form, so 3.99 shows as
+            # 3.99 and not 3.990000009536743
+            labels[:-1] = uniques.to_numpy().astype(str)
+        else:
+            labels[:-1] = [str(val) for val in uniques]
+        labels[-1] = ''
+        columns.append(labels[codes])
+    if not columns:
+        return [()] * len(df)
+    return list(zip(*columns))
+
+
+class TreeViewModel:
+    # Mirrors what is currently shown in a ttk.Treeview (item ids, order and
+    # cell values) so a refresh only issues the Tk calls for rows that changed.
+    #
+    # Above VIRTUAL_THRESHOLD rows the tree switches to windowed rendering:
+    # only the rows in the viewport (plus BUFFER_ROWS) exist as Tk items and
+    # the vertical scrollbar is driven from the backing DataFrame instead.
+    VIRTUAL_THRESHOLD = 2000
+    BUFFER_ROWS = 10
+    ROW_HEIGHT = 20
+    # event.state bits that make a click or arrow key extend the selection
+    EXTEND_MASK = 0x0001 | 0x0004
+
+    def __init__(self, tree, v_scroll=None, on_heading_click=None):
+        self.tree = tree
+        self.v_scroll = v_scroll
+        self.on_heading_click = on_heading_click
+        self.token = None
+        self.columns = []
+        self.order = []
+        self.rows = {}
+
+        self.windowed = False
+        self.ids = []
+        self.frame = None
+        self.first = 0
+        self.selection = set()
+        # Whether the next <<TreeviewSelect>> comes from a plain click or
+        # arrow key (which replaces the selection) or a Ctrl/Shift one
+        self.replacing = False
+
+        if v_scroll is not None:
+            v_scroll.configure(command=self.yview)
+            tree.configure(yscrollcommand=self.on_tree_yscroll)
+        tree.bind('<<TreeviewSelect>>', self.on_select, add='+')
+        tree.bind('<Button-1>', self.on_click, add='+')
+        tree.bind('<Configure>', self.on_configure, add='+')
+        tree.bind('<MouseWheel>', self.on_mousewheel, add='+')
+        tree.bind('<Button-4>', self.on_mousewheel, add='+')
+        tree.bind('<Button-5>', self.on_mousewheel, add='+')
+        tree.bind('<Up>', self.on_key_up, add='+')
+        tree.bind('<Down>', self.on_key_down, add='+')
+
+    @timed('tree_sync')
+    def sync(self, ids, df, token=None):
+        # token identifies the data that was last rendered; when it has not
+        # changed the tree is left alone entirely.
+        if token is not None and token == self.token:
+            return False
+        self.token = token
+
+        columns = list(df.columns)
+        windowed = len(df) > self.VIRTUAL_THRESHOLD
+        if columns != self.columns or windowed != self.windowed:
+            self.clear()
+            self.setup_columns(columns)
+            self.windowed = windowed
+            self.first = 0
+            self.selection = set()
+
+        if windowed:
+            self.ids = list(ids)
+            self.frame = df
+            self.selection &= set(self.ids)
+            self.render_window()
+        else:
+            self.ids = []
+            self.frame = None
+            new_order = list(ids)
+            self.apply(new_order, dict(zip(new_order, self.row_values(df))))
+        return True
+
+    def apply(self, new_order, rows):
+        old_rows = self.rows
+        tree = self.tree
+        count('rows_rendered', len(new_order))
+
+        if not old_rows:
+            insert = tree.insert
+            for iid in new_order:
+                insert('', 'end', iid=iid, values=rows[iid])
+            count('tk_inserted', len(new_order))
+            self.order = new_order
+            self.rows = rows
+            return
+
+        removed = [iid for iid in self.order if iid not in rows]
+        if removed:
+            tree.delete(*removed)
+            count('tk_deleted', len(removed))
+        surviving = [iid for iid in self.order if iid in rows]
+
+        # Existing items keep their relative order unless the data was
+        # reordered; from the first out-of-place item onwards every remaining
+        # item is moved into position.
+        moving = False
+        k = 0
+        moved = updated = 0
+        for i, iid in enumerate(new_order):
+            values = rows[iid]
+            old_values = old_rows.get(iid)
+            if old_values is None:
+                tree.insert('', i, iid=iid, values=values)
+                continue
+            if not moving and surviving[k] != iid:
+                moving = True
+            k += 1
+            if moving:
+                tree.move(iid, '', i)
+                moved += 1
+            if old_values != values:
+                tree.item(iid, values=values)
+                updated += 1
+        count('tk_inserted', len(new_order) - k)
+        count('tk_moved', moved)
+        count('tk_updated', updated)
+
+        self.order = new_order
+        self.rows = rows
+
+    def invalidate(self):
+        self.token = None
+
+    def clear(self):
+        children = self.tree.get_children()
+        if children:
+            self.tree.delete(*children)
+            count('tk_deleted', len(children))
+        self.order = []
+        self.rows = {}
+
+    def setup_columns(self, columns):
+        tree = self.tree
+        tree['columns'] = columns
+        tree['show'] = 'headings'
+        for col in columns:
+            if self.on_heading_click:
+                tree.heading(col, text=col, command=lambda _col=col: self.on_heading_click(tree, _col))
+            else:
+                tree.heading(col, text=col)
+            tree.column(col, width=120)
+        self.columns = columns
+
+    def row_values(self, df):
+        return frame_rows(df)
+
+    def selected_ids(self):
+        if self.windowed:
+            # On-screen selection first, then rows scrolled out of view
+            visible = list(self.tree.selection())
+            return visible + [iid for iid in self.ids if iid in self.selection and iid not in visible]
+        return list(self.tree.selection())
+
+    # Windowed rendering
+
+    def page_size(self):
+        height = self.tree.winfo_height()
+        if height <= 1:
+            height = int(self.tree['height']) * self.ROW_HEIGHT
+        # One row's worth of height is taken by the headings
+        return max(1, height // self.ROW_HEIGHT - 1)
+
+    def render_window(self):
+        total = len(self.ids)
+        page = self.page_size()
+        self.first = max(0, min(self.first, total - page))
+        stop = min(total, self.first + page + self.BUFFER_ROWS)
+        window = self.ids[self.first:stop]
+        self.apply(window, dict(zip(window, self.row_values(self.frame.iloc[self.first:stop]))))
+
+        # The tree's own view always starts at the top of the window
+        self.tree.yview_moveto(0)
+        visible = [iid for iid in window if iid in self.selection]
+        if tuple(visible) != self.tree.selection():
+            self.tree.selection_set(visible)
+        if self.v_scroll is not None:
+            if total:
+                self.v_scroll.set(self.first / total, min(1.0, (self.first + page) / total))
+            else:
+                self.v_scroll.set(0.0, 1.0)
+
+    def scroll_to(self, first):
+        first = max(0, min(first, len(self.ids) - self.page_size()))
+        if first != self.first:
+            self.first = first
+            self.render_window()
+
+    def yview(self, *args):
+        if not self.windowed:
+            return self.tree.yview(*args)
+        if args[0] == 'moveto':
+            self.scroll_to(int(float(args[1]) * len(self.ids)))
+        elif args[0] == 'scroll':
+            step = int(args[1])
+            if args[2] == 'pages':
+                step *= self.page_size()
+            self.scroll_to(self.first + step)
+
+    def on_tree_yscroll(self, first, last):
+        if not self.windowed and self.v_scroll is not None:
+            self.v_scroll.set(first, last)
+
+    def on_click(self, event):
+        # Clicks outside the rows leave the selection alone
+        if self.tree.identify_row(event.y):
+            self.replacing = not event.state & self.EXTEND_MASK
+
+    def on_select(self, event=None):
+        replacing, self.replacing = self.replacing, False
+        if not self.windowed:
+            return
+        if replacing:
+            # Rows selected before and now scrolled out of view are dropped too
+            self.selection = set(self.tree.selection())
+            return
+        window = set(self.order)
+        self.selection = (self.selection - window) | set(self.tree.selection())
+
+    def on_configure(self, event=None):
+        if self.windowed:
+            self.render_window()
+
+    def on_mousewheel(self, event):
+        if not self.windowed:
+            return None
+        if event.num == 4 or event.delta > 0:
+            self.scroll_to(self.first - 3)
+        else:
+            self.scroll_to(self.first + 3)
+        return 'break'
+
+    def on_key_up(self, event=None):
+        self.replacing = event is not None and not event.state & self.EXTEND_MASK
+        # Shift the window before the default binding moves the focus, so the
+        # row above the top edge already exists when Tk looks for it
+        if self.windowed and self.order and self.tree.focus() == self.order[0]:
+            self.scroll_to(self.first - 1)
+
+    def on_key_down(self, event=None):
+        self.replacing = event is not None and not event.state & self.EXTEND_MASK
+        page = self.page_size()
+        if self.windowed and len(self.order) >= page and self.tree.focus() == self.order[page - 1]:
+            self.scroll_to(self.first + 1)
@@ -1,15 +1,101 @@
+import heapq
+from operator import itemgetter
+
 import pandas as pd
+from models.compact import TextStore, compact_frame, fit_columns
+from services.fulltext import FullTextIndex
+from services.search import SearchIndex, search_columns
+from services.sorting import sort_key, sort_order
+from utils.instrumentation import count, timed
+
+ID_COLUMN = 'Roll number'
+# read_csv arguments for form exports: roll numbers stay text (pandas would
+# read 27100168 as an int, or a float once any is blank, and 2028-10-0374 as
+# text), so they match the ids of a saved state
+CSV_DTYPES = {ID_COLUMN: str}
+# Optional column carrying saved candidate ids (binary state formats)
+ID_FIELD = '_id'
+DECISIONS = ['Strong Hire', 'Hire', 'Weak Hire', "Don't Hire"]
+BUCKETS = ['Available', 'Dismissed'] + DECISIONS
+STATUSES = ['Available', 'Dismissed', 'Decided']
+
+def candidate_ids(df):
+    # Stable per-candidate keys (the roll number); repeated roll numbers get a
+    # '#n' suffix so every row still has a unique key.
+    if ID_COLUMN in df.columns:
+        ids = df[ID_COLUMN].astype(str).str.strip()
+        ids = ids.where(df[ID_COLUMN].notna(), 'row-' + df.index.astype(str))
+    else:
+        ids = pd.Series('row-' + df.index.astype(str), index=df.index)
+    dup = ids.groupby(ids).cumcount()
+    return ids.where(dup == 0, ids + '#' + (dup + 1).astype(str))
+
+def typed_rows(df):
+    # The app's own columns at the end (as they were on import), with
+    # Status/Decision as categoricals
+    if 'Interview Score' not in df.columns:
+        df['Interview Score'] = ''
+    ordered = [col for col in df.columns if col not in ('Interview Score', 'Decision', 'Status')]
+    df = df[ordered + ['Interview Score', 'Decision', 'Status']].copy()
+    df['Interview Score'] = df['Interview Score'].astype(object)
+    df['Status'] = pd.Categorical(df['Status'], categories=STATUSES)
+    df['Decision'] = pd.Categorical(df['Decision'].fillna(''), categories=[''] + DECISIONS)
+    return df
+
+def unique_ids(ids, existing):
+    # Suffixes ids that are already taken, the same way candidate_ids does
+    taken = set(existing)
+    result = []
+    for candidate_id in ids:
+        if candidate_id in taken:
+            base = candidate_id.split('#')[0]
+            n = 2
+            while f"{base}#{n}" in taken:
+                n += 1
+            candidate_id = f"{base}#{n}"
+        taken.add(candidate_id)
+        result.append(candidate_id)
+    return result
+
+def parse_timestamps(series):
+    # Google Form exports use day-first timestamps, e.g. 14/07/2025 20:49:00
+    return pd.to_datetime(series, dayfirst=True, errors='coerce')
+
+def latest_rows(df):
+    # One row per roll number, keeping the latest submission
+    if ID_COLUMN not in df.columns:
+        return df
+    if 'Timestamp' in df.columns:
+        df = df.iloc[parse_timestamps(df['Timestamp']).argsort(kind='stable')]
+    keys = df[ID_COLUMN].astype(str).str.strip()
+    keep = ~keys.duplicated(keep='last') | df[ID_COLUMN].isna()
+    return df[keep.to_numpy()]
+
+def row_hashes(df):
+    # Content hash per row over the values as displayed, so the same answer
+    # hashes the same whether it came from a CSV or a saved state
+    text = df.astype(object).where(df.notna(), '').astype(str)
+    return pd.util.hash_pandas_object(text, index=False)
 
 class CandidateManager:
-    def __init__(self):
-        self.candidates = pd.DataFrame()
-        self.dismissed_candidates = pd.DataFrame()
-        self.hired_candidates = {
-            'Strong Hire': pd.DataFrame(),
-            'Hire': pd.DataFrame(),
-            'Weak Hire': pd.DataFrame(),
-            "Don't Hire": pd.DataFrame()
-        }
+    # All candidates live in one table indexed by candidate id. Status and
+    # Decision are categorical columns, and each tab's bucket is an ordered
+    # set of ids (a dict), so moving a candidate is a couple of O(1) updates
+    # instead of copying rows between DataFrames. The dict values are order
+    # keys, increasing along each bucket, which is what lets a move be undone
+    # back into the same place.
+    #
+    # With compact=True the table is kept small (see models.compact): narrow
+    # dtypes, and long answers in text_store with a preview in the table.
+    # expanded()/details() give the full rows back.
+    def __init__(self, compact=False):
+        self.table = pd.DataFrame()
+        self.compact = compact
+        self.text_store = TextStore()
+        self.members = {bucket: {} for bucket in BUCKETS}
+        # Next order key; keys only ever grow, so appended ids sort last
+        self.tick = 0
+        self.views = {}
         # self.display_columns = [
         #     'Full name', 'Roll number', 'Current CGPA', 'If you have declared a major, please specify', 'Grade in CS 200', 'Grade in CS 202 (if taken)',
         #     'Would you be able to attend the lectures? MW 11 am to 12:15 pm', 'If you expect a clash with the lecture, please specify the day and duration and timing. For example, Wednesday: 30 minutes, 11 am to 11:30 am.',
@@ -19,44 +105,432 @@ class CandidateManager:
         # ]
 
         self.columns = []
+        self.revisions = {bucket: 0 for bucket in BUCKETS}
+        self.search_index = SearchIndex()
+        self.fulltext_index = FullTextIndex()
+        self.unbuilt_indexes = []
+        self.hashes = None
+        self.sort_keys = {}
+        # Called with a small dict describing each change (see emit)
+        self.listeners = []
+
+    @property
+    def candidates(self):
+        return self.bucket('Available')
+
+    @property
+    def dismissed_candidates(self):
+        return self.bucket('Dismissed')
+
+    @property
+    def hired_candidates(self):
+        return {decision: self.bucket(decision) for decision in DECISIONS}
+
+    def emit(self, entry):
+        for listener in self.listeners:
+            listener(entry)
+
+    def snapshot(self):
+        # Point-in-time copy of the data (without search indexes) that can be
+        # saved off the GUI thread
+        copy = CandidateManager(self.compact)
+        copy.table = self.table.copy()
+        copy.text_store = self.text_store.copy()
+        copy.members = {bucket: dict(ids) for bucket, ids in self.members.items()}
+        copy.tick = self.tick
+        copy.columns = list(self.columns)
+        return copy
+
+    def touch(self, *buckets):
+        # Bumped whenever a bucket's rows change so views can skip unchanged ones
+        for bucket in buckets or BUCKETS:
+            self.revisions[bucket] += 1
+
+    def bucket(self, name):
+        # Rows of one tab in display order, indexed by candidate id; rebuilt
+        # only after the bucket changes
+        revision = self.revisions[name]
+        cached = self.views.get(name)
+        if cached is not None and cached[0] == revision:
+            return cached[1]
+        ids = list(self.members[name])
+        view = self.table.loc[ids] if ids else self.table.iloc[:0]
+        self.views[name] = (revision, view)
+        return view
+
+    def append_ids(self, bucket, ids):
+        # Adds ids at the end of a bucket
+        self.members[bucket].update(zip(ids, range(self.tick, self.tick + len(ids))))
+        self.tick += len(ids)
+
+    def bucket_of(self, candidate_id):
+        status = self.table.at[candidate_id, 'Status']
+        if status == 'Decided':
+            return self.table.at[candidate_id, 'Decision']
+        return status
+
+    def set_state(self, buckets):
+        # Replaces every candidate; buckets maps bucket name -> DataFrame rows
+        frames = []
+        for name in BUCKETS:
+            df = buckets.get(name)
+            if df is None or df.empty:
+                continue
+            df = df.copy()
+            df['Status'] = name if name in ('Available', 'Dismissed') else 'Decided'
+            df['Decision'] = name if name in DECISIONS else ''
+            frames.append(df)
+        table = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+        if not table.empty:
+            table = typed_rows(table)
+            if ID_FIELD in table.columns:
+                ids = table.pop(ID_FIELD).astype(str)
+                table.index = pd.Index(ids.where(ids.notna() & (ids != 'nan'), candidate_ids(table)).to_numpy())
+            else:
+                table.index = pd.Index(candidate_ids(table).to_numpy())
+        self.table = table
+        self.columns = [col for col in table.columns if col not in ('Interview Score', 'Decision', 'Status')]
+        self.text_store.clear()
+        self.compact_table()
+
+        self.members = {bucket: {} for bucket in BUCKETS}
+        placed = {bucket: [] for bucket in BUCKETS}
+        for candidate_id, status, decision in zip(table.index, table.get('Status', []), table.get('Decision', [])):
+            placed[decision if status == 'Decided' else status].append(candidate_id)
+        for bucket, ids in placed.items():
+            self.append_ids(bucket, ids)
+
+        self.touch()
+        self.invalidate_sort_keys()
+        self.reset_search_indexes()
+        self.emit({'op': 'reset'})
+
+    def compact_table(self):
+        if self.compact and not self.table.empty:
+            # Long answers out first, so their previews are never made categorical
+            table = self.text_store.store(self.table, [ID_COLUMN])
+            self.table = compact_frame(table, [ID_COLUMN] + list(self.text_store.cells))
+            self.touch()
+
+    def expanded(self, df):
+        # Rows of the table with full answers and the original dtypes
+        return self.text_store.expand(df) if self.compact else df
+
+    def details(self, candidate_id):
+        return self.expanded(self.table.loc[[candidate_id]]).iloc[0]
+
+    def buckets_of(self, ids):
+        rows = self.table.loc[list(ids), ['Status', 'Decision']]
+        status = rows['Status'].astype(str)
+        return status.where(status != 'Decided', rows['Decision'].astype(str))
+
+    @timed('move')
+    def move(self, ids, target, keys=None):
+        # Moves every candidate in ids to the target bucket with one column
+        # write per field. They go to the end of the bucket, or with keys
+        # (order keys from an earlier move's event) back where they were.
+        if keys is not None:
+            keys = dict(zip(ids, keys))
+        ids = list(dict.fromkeys(ids))
+        sources = self.buckets_of(ids)
+        sources = sources[sources != target]
+        if sources.empty:
+            return
+        ids = list(sources.index)
+        sources = list(sources)
+        # Each candidate's old order key, so the move can be undone (see models.history)
+        old_keys = [self.members[source].pop(candidate_id) for candidate_id, source in zip(ids, sources)]
+        if keys is None:
+            self.append_ids(target, ids)
+        else:
+            returning = sorted(((candidate_id, keys[candidate_id]) for candidate_id in ids), key=itemgetter(1))
+            self.members[target] = dict(heapq.merge(self.members[target].items(), returning, key=itemgetter(1)))
+        count('candidates_moved', len(ids))
+        if target in DECISIONS:
+            self.table.loc[ids, 'Status'] = 'Decided'
+            self.table.loc[ids, 'Decision'] = target
+        else:
+            self.table.loc[ids, 'Status'] = target
+            self.table.loc[ids, 'Decision'] = ''
+        self.touch(target, *set(sources))
+        self.invalidate_sort_keys('Decision', 'Status')
+        self.emit({'op': 'move', 'ids': ids, 'target': target,
+                   'sources': sources, 'keys': old_keys, 'placed': keys is not None})
+
+    @timed('select')
+    def select(self, rule, bucket='Available'):
+        # Ids in a bucket matching rule: a DataFrame.query expression (use
+        # backticks around column names) or a callable returning a mask
+        df = self.bucket(bucket)
+        if df.empty:
+            return []
+        if callable(rule):
+            mask = rule(df)
+        else:
+            mask = df.eval(rule)
+        return list(df.index[pd.Series(mask, index=df.index).fillna(False).astype(bool)])
+
+    def reorder(self, name, ids, spec=None):
+        # spec: how the order was computed, {'sort': columns, 'ascending': flags}
+        # or {'rank': weights}, so it can be recomputed instead of kept
+        # The replaced dict is not copied: nothing else holds on to it
+        previous = self.members[name]
+        if isinstance(ids, dict):
+            # An earlier order with its keys (undo), so moves undone after it
+            # find their places again
+            self.members[name] = {candidate_id: key for candidate_id, key in ids.items() if candidate_id in previous}
+            self.append_ids(name, [candidate_id for candidate_id in previous if candidate_id not in ids])
+            ids = list(self.members[name])
+        else:
+            ids = list(ids)
+            self.members[name] = {}
+            self.append_ids(name, ids)
+        self.touch(name)
+        entry = {'op': 'order', 'bucket': name, 'previous': previous}
+        if spec is None:
+            entry['ids'] = ids
+        else:
+            entry['spec'] = spec
+        self.emit(entry)
+
+    def sort_by(self, name, spec):
+        # Recomputes an order from a reorder() spec
+        if 'rank' in spec:
+            from services.ranking import Ranker
+            Ranker(self, spec['rank']).rank_bucket(name)
+        else:
+            self.sort_bucket(name, spec['sort'], spec['ascending'])
+
+    def sort_key(self, column):
+        # Typed sort keys for the whole pool indexed by candidate id; cached
+        # until a cell in that column changes
+        keys = self.sort_keys.get(column)
+        if keys is None:
+            keys = pd.Series(sort_key(self.table[column], column), index=self.table.index)
+            self.sort_keys[column] = keys
+        return keys
+
+    def invalidate_sort_keys(self, *columns):
+        if not columns:
+            self.sort_keys.clear()
+        for column in columns:
+            self.sort_keys.pop(column, None)
+
+    @timed('sort_bucket')
+    def sort_bucket(self, name, sort_columns, ascending_order):
+        ids = list(self.members[name])
+        if not ids or not sort_columns:
+            return
+        keys = [self.sort_key(col).reindex(ids).to_numpy() for col in sort_columns]
+        self.reorder(name, [ids[i] for i in sort_order(keys, ascending_order)],
+                     {'sort': list(sort_columns), 'ascending': [bool(flag) for flag in ascending_order]})
 
+    def reset_search_indexes(self):
+        # Names, roll numbers and answers only change when candidates are
+        # loaded; each index is rebuilt on its first query after that so
+        # loading stays cheap
+        self.search_index.clear()
+        self.fulltext_index.clear()
+        self.unbuilt_indexes = [self.search_index, self.fulltext_index]
+        self.hashes = None
+
+    def built(self, index):
+        if index in self.unbuilt_indexes:
+            df = self.table
+            if index is self.search_index:
+                # Names and roll numbers only; expanding every answer would
+                # hold up the first keystroke
+                df = df[search_columns(df.columns)]
+            index.add_frame(self.table.index, self.expanded(df))
+            self.unbuilt_indexes.remove(index)
+        return index
+
+    @timed('search')
+    def search(self, query):
+        # Ids whose name or roll number contains query, or None for no filter
+        if not query.strip():
+            return None
+        return self.built(self.search_index).search(query)
+
+    @timed('fulltext_search')
+    def fulltext_search(self, query, limit=None):
+        if not query.strip():
+            return []
+        return self.built(self.fulltext_index).search(query, limit)
+
+    def prepare_import(self, df):
+        df['Interview Score'] = ''
+        df['Decision'] = ''
+        df['Status'] = 'Available'
+        return df
+
+    @timed('load_candidates')
     def load_candidates(self, file_path):
-        df = pd.read_csv(file_path)
+        df = pd.read_csv(file_path, dtype=CSV_DTYPES)
         self.columns = list(df.columns)
         for col in self.columns:
             if col not in df.columns:
                 df[col] = ''
-        df['Interview Score'] = ''
-        df['Decision'] = ''
-        df['Status'] = 'Available'
-        self.candidates = df[df['Status'] == 'Available'].copy()
-        self.dismissed_candidates = df[df['Status'] == 'Dismissed'].copy()
-        for decision in self.hired_candidates.keys():
-            self.hired_candidates[decision] = df[df['Decision'] == decision].copy()
-
-    def add_interview_score(self, idx, score):
-        self.candidates.at[idx, 'Interview Score'] = score
-
-    def make_decision(self, idx, decision):
-        candidate_row = self.candidates.iloc[[idx]].copy()
-        candidate_row['Decision'] = decision
-        candidate_row['Status'] = 'Decided'
-        self.hired_candidates[decision] = pd.concat([self.hired_candidates[decision], candidate_row], ignore_index=True)
-        self.candidates = self.candidates.drop(self.candidates.index[idx]).reset_index(drop=True)
-
-    def dismiss_candidate(self, idx):
-        candidate_row = self.candidates.iloc[[idx]].copy()
-        candidate_row['Status'] = 'Dismissed'
-        self.dismissed_candidates = pd.concat([self.dismissed_candidates, candidate_row], ignore_index=True)
-        self.candidates = self.candidates.drop(self.candidates.index[idx]).reset_index(drop=True)
-
-    def restore_candidate(self, idx):
-        candidate_row = self.dismissed_candidates.iloc[[idx]].copy()
-        candidate_row['Status'] = 'Available'
-        self.candidates = pd.concat([self.candidates, candidate_row], ignore_index=True)
-        self.dismissed_candidates = self.dismissed_candidates.drop(self.dismissed_candidates.index[idx]).reset_index(drop=True)
+        self.set_state({'Available': self.prepare_import(df)})
 
-    def sort_candidates(self, sort_columns, ascending_order):
-        if not sort_columns:
+    def begin_import(self):
+        # Chunked import: begin_import, append_candidates per chunk, then
+        # finish_import (which lets listeners snapshot the result)
+        self.table = pd.DataFrame()
+        self.members = {bucket: {} for bucket in BUCKETS}
+        self.columns = []
+        self.text_store.clear()
+        self.touch()
+        self.invalidate_sort_keys()
+        self.reset_search_indexes()
+
+    @timed('append_candidates')
+    def append_candidates(self, df):
+        df = typed_rows(self.prepare_import(df))
+        count('rows_imported', len(df))
+        ids = unique_ids(candidate_ids(df), self.table.index)
+        df.index = pd.Index(ids)
+        if self.table.empty:
+            self.table = df
+            self.columns = [col for col in df.columns if col not in ('Interview Score', 'Decision', 'Status')]
+        else:
+            self.table = pd.concat([self.table, df.reindex(columns=self.table.columns)])
+        self.append_ids('Available', ids)
+        self.touch('Available')
+        self.invalidate_sort_keys()
+        # Indexes that were already built are extended with the new rows
+        for index in (self.search_index, self.fulltext_index):
+            if index not in self.unbuilt_indexes:
+                index.add_frame(ids, df)
+
+    def form_hashes(self):
+        # Content hashes of every candidate's form answers, by id
+        if self.hashes is None or not self.hashes.index.equals(self.table.index):
+            self.hashes = row_hashes(self.expanded(self.table[self.columns]))
+            self.hashes.index = self.table.index
+        return self.hashes
+
+    @timed('merge_candidates')
+    def merge_candidates(self, df):
+        # Merges a newer export of the form into the pool without touching
+        # interview scores or decisions. Rows are matched on roll number and
+        # the latest Timestamp wins; only new or changed rows (by content
+        # hash) are written. Call finish_import() afterwards.
+        df = latest_rows(df)
+        if self.table.empty:
+            self.append_candidates(df)
+            return {'added': len(df), 'updated': 0, 'unchanged': 0}
+
+        form_columns = [col for col in df.columns if col not in ('Interview Score', 'Decision', 'Status')]
+        for col in form_columns:
+            if col not in self.table.columns:
+                self.table.insert(len(self.columns), col, '')
+                self.columns.append(col)
+
+        frame = df.reindex(columns=self.columns)
+        ids = df[ID_COLUMN].astype(str).str.strip() if ID_COLUMN in df.columns else pd.Series('', index=df.index)
+        frame.index = pd.Index(ids.to_numpy())
+        keyed = (df[ID_COLUMN].notna() if ID_COLUMN in df.columns else pd.Series(False, index=df.index)).to_numpy()
+        known = keyed & ids.isin(self.table.index).to_numpy()
+
+        incoming = row_hashes(frame).to_numpy()
+        current = self.form_hashes()
+        changed = known.copy()
+        changed[known] = incoming[known] != current.reindex(frame.index[known]).to_numpy()
+        if 'Timestamp' in self.columns:
+            # An older submission never overwrites a newer one
+            new_time = parse_timestamps(frame['Timestamp']).to_numpy()
+            old_time = parse_timestamps(self.table['Timestamp'].reindex(frame.index)).to_numpy()
+            changed &= ~(new_time < old_time)
+
+        updated = frame[changed].copy()
+        if not updated.empty:
+            fit_columns(self.table, updated)
+            self.table.loc[updated.index, self.columns] = updated
+            self.touch(*set(self.buckets_of(updated.index)))
+            self.invalidate_sort_keys(*self.columns)
+            for index in (self.search_index, self.fulltext_index):
+                if index not in self.unbuilt_indexes:
+                    # The merged rows themselves: in a compact table text
+                    # columns may be categorical or hold previews
+                    index.add_frame(updated.index, updated)
+
+        # Rows without a roll number can't be matched, so they are only added
+        # when no candidate has exactly the same answers
+        new_rows = ~known & (keyed | ~pd.Series(incoming).isin(current).to_numpy())
+        if new_rows.any():
+            self.append_candidates(df[new_rows])
+        self.hashes = None
+        return {'added': int(new_rows.sum()), 'updated': int(changed.sum()),
+                'unchanged': int(known.sum() - changed.sum())}
+
+    def finish_import(self, compacted=None):
+        # compacted: a snapshot() of this manager already put through
+        # compact_table() (off the GUI thread); its data replaces ours
+        if compacted is None:
+            self.compact_table()
+        else:
+            self.table = compacted.table
+            self.text_store = compacted.text_store
+            self.members = compacted.members
+            self.touch()
+            self.invalidate_sort_keys()
+        self.emit({'op': 'reset'})
+
+    def restore(self, snapshot):
+        # Puts back the data of a snapshot() (e.g. after a cancelled import)
+        self.table = snapshot.table
+        self.members = snapshot.members
+        self.tick = max(self.tick, snapshot.tick)
+        self.columns = snapshot.columns
+        self.text_store = snapshot.text_store
+        self.touch()
+        self.invalidate_sort_keys()
+        self.reset_search_indexes()
+        self.emit({'op': 'reset'})
+
+    def add_interview_score(self, candidate_id, score):
+        self.score_many([candidate_id], score)
+
+    def make_decision(self, candidate_id, decision):
+        self.move([candidate_id], decision)
+
+    def dismiss_candidate(self, candidate_id):
+        self.move([candidate_id], 'Dismissed')
+
+    def restore_candidate(self, candidate_id):
+        self.move([candidate_id], 'Available')
+
+    def score_many(self, ids, scores):
+        # scores is a single score for everyone or one score per candidate
+        # (the last one counts for an id listed twice)
+        if isinstance(scores, (list, tuple)):
+            latest = dict(zip(ids, scores))
+            ids, scores = list(latest), list(latest.values())
+        else:
+            ids = list(dict.fromkeys(ids))
+        if not ids:
             return
-        self.candidates = self.candidates.sort_values(by=sort_columns, ascending=ascending_order).reset_index(drop=True)
\ No newline at end of file
+        previous = self.table.loc[ids, 'Interview Score'].tolist()
+        self.table.loc[ids, 'Interview Score'] = scores
+        self.touch(*set(self.buckets_of(ids)))
+        self.invalidate_sort_keys('Interview Score')
+        self.emit({'op': 'score', 'ids': ids, 'scores': scores, 'previous': previous})
+
+    def decide_many(self, ids, decision):
+        self.move(ids, decision)
+
+    def dismiss_many(self, ids):
+        self.move(ids, 'Dismissed')
+
+    def restore_many(self, ids):
+        self.move(ids, 'Available')
+
+    def dismiss_where(self, rule, bucket='Available'):
+        # e.g. "`Would you be able to attend the lab? Fri 2 pm to 4:50 pm` == 'No' and `Current CGPA` < 3.0"
+        ids = self.select(rule, bucket)
+        self.dismiss_many(ids)
+        return ids
+
+    def sort_candidates(self, sort_columns, ascending_order):
+        self.sort_bucket('Available', sort_columns, ascending_order)
@@ -0,0 +1,172 @@
+import zlib
+import pandas as pd
+
+# Text columns with at most this many distinct values per row are stored as
+# categoricals (grades, majors, Yes/No answers)
+CATEGORY_RATIO = 0.5
+# Free-text answers longer than this on average go to the TextStore; the
+# table keeps a PREVIEW-character prefix for the tabs
+LONG_TEXT = 80
+PREVIEW = 60
+ELLIPSIS = '…'
+SCORE_COLUMN = 'Interview Score'
+# Columns the app writes itself, which keep their own dtypes
+KEEP_COLUMNS = {'Decision', 'Status'}
+
+
+def is_text(series):
+    return series.dtype == object or str(series.dtype) in ('str', 'string')
+
+
+def holds_text(series):
+    # Text, plain or as a categorical of strings
+    dtype = series.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        return dtype.categories.dtype == object or str(dtype.categories.dtype) in ('str', 'string')
+    return is_text(series)
+
+
+def compact_frame(df, skip=()):
+    # Narrows dtypes in place: floats (CGPA, the interview score) to float32
+    # and repetitive text to categoricals. skip must include the columns in
+    # a TextStore: their previews repeat, but stay plain text for it.
+    for col in df.columns:
+        if col in KEEP_COLUMNS or col in skip:
+            continue
+        series = df[col]
+        if col == SCORE_COLUMN:
+            df[col] = pd.to_numeric(series, errors='coerce').astype('float32')
+        elif series.dtype == 'float64':
+            df[col] = series.astype('float32')
+        elif is_text(series) and len(series) > 1 and series.nunique() <= len(series) * CATEGORY_RATIO:
+            df[col] = series.astype('category')
+    return df
+
+
+def fit_columns(table, df):
+    # Lets rows from df be written into table's columns: numbers arriving in
+    # a text column become text, categoricals get any new values as
+    # categories, and numeric columns take numbers (or fall back to object
+    # for anything else)
+    for col in df.columns:
+        if col not in table.columns:
+            continue
+        dtype = table[col].dtype
+        categorical = isinstance(dtype, pd.CategoricalDtype)
+        incoming = df[col]
+        if holds_text(table[col]) and not holds_text(incoming) and incoming.notna().any():
+            df[col] = incoming.astype(object).where(incoming.isna(), incoming.astype(str))
+        if categorical:
+            values = pd.Index(df[col].dropna().unique())
+            new = values.difference(dtype.categories)
+            if len(new):
+                table[col] = table[col].cat.add_categories(new)
+        elif pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype):
+            numbers = pd.to_numeric(df[col], errors='coerce')
+            if (numbers.isna() & df[col].notna()).any():
+                table[col] = table[col].astype(object)
+            elif dtype == 'float32':
+                df[col] = numbers.astype('float32')
+            else:
+                if dtype.kind != 'f':
+                    table[col] = table[col].astype('float64')
+                df[col] = numbers.astype('float64')
+
+
+class TextStore:
+    # Long free-text answers kept out of the candidate table. Each cell is
+    # deflated on its own (so one candidate can be read back without touching
+    # the rest) against a per-column dictionary sampled from that column's
+    # answers, which is what makes short texts compress well.
+    SAMPLE_ROWS = 200
+    # Bigger dictionaries barely compress better but cost more per cell
+    ZDICT_BYTES = 8192
+
+    def __init__(self):
+        self.cells = {}
+        self.zdicts = {}
+
+    def copy(self):
+        store = TextStore()
+        store.cells = {col: dict(cells) for col, cells in self.cells.items()}
+        store.zdicts = dict(self.zdicts)
+        return store
+
+    def clear(self):
+        self.cells = {}
+        self.zdicts = {}
+
+    def nbytes(self):
+        return sum(len(data) for cells in self.cells.values() for data in cells.values()) + \
+            sum(len(zdict) for zdict in self.zdicts.values())
+
+    def long_columns(self, df, skip=()):
+        columns = []
+        for col in df.columns:
+            if col in KEEP_COLUMNS or col in skip or not holds_text(df[col]):
+                continue
+            if col in self.cells or df[col].dropna().astype(str).str.len().mean() > LONG_TEXT:
+                columns.append(col)
+        return columns
+
+    def store(self, df, skip=()):
+        # Moves long cells of df (indexed by candidate id) into the store and
+        # leaves previews behind; cells that are already previews are skipped
+        for col in self.long_columns(df, skip):
+            cells = self.cells.setdefault(col, {})
+            text = df[col].astype(object)
+            values = text.where(text.notna(), '').astype(str)
+            long = (values.str.len() > PREVIEW + 1).to_numpy()
+            preview = ((values.str.len() == PREVIEW + 1) & values.str.endswith(ELLIPSIS)).to_numpy()
+            for candidate_id in df.index[~long & ~preview]:
+                # An answer that was edited to something short
+                cells.pop(candidate_id, None)
+            if not long.any():
+                continue
+            if col not in self.zdicts:
+                sample = '\n'.join(text[long].iloc[:self.SAMPLE_ROWS].astype(str))
+                self.zdicts[col] = sample.encode()[-self.ZDICT_BYTES:]
+            zdict = self.zdicts[col]
+            previews = []
+            for candidate_id, value in zip(df.index[long], text[long]):
+                deflate = zlib.compressobj(6, zlib.DEFLATED, -15, zdict=zdict)
+                cells[candidate_id] = deflate.compress(value.encode()) + deflate.flush()
+                previews.append(value[:PREVIEW] + ELLIPSIS)
+            text = text.copy()
+            text[long] = previews
+            df[col] = text
+        return df
+
+    def get(self, candidate_id, column):
+        data = self.cells.get(column, {}).get(candidate_id)
+        if data is None:
+            return None
+        inflate = zlib.decompressobj(-15, zdict=self.zdicts[column])
+        return (inflate.decompress(data) + inflate.flush()).decode()
+
+    def expand(self, df):
+        # Copy of df with full answers in place of previews and the original
+        # dtypes back (plain floats, '' for no interview score)
+        if df.empty:
+            return df
+        df = df.copy()
+        for col in df.columns:
+            if isinstance(df[col].dtype, pd.CategoricalDtype) and col not in KEEP_COLUMNS:
+                df[col] = df[col].astype(object)
+            elif df[col].dtype == 'float32':
+                # Through str so 3.99 comes back as 3.99, not 3.990000009536743
+                values = pd.to_numeric(df[col].astype(str), errors='coerce')
+                df[col] = values.astype(object).where(values.notna(), '') if col == SCORE_COLUMN else values
+        for col, cells in self.cells.items():
+            if col not in df.columns or not cells:
+                continue
+            text = df[col].astype(object).to_numpy(copy=True)
+            for i, candidate_id in enumerate(df.index):
+                if candidate_id in cells:
+                    text[i] = self.get(candidate_id, col)
+            df[col] = text
+        return df
+
+
+def table_nbytes(df):
+    return int(df.memory_usage(deep=True).sum()) if not df.empty else 0
@@ -0,0 +1,121 @@
+# Parts of a manager event that only describe the state before it
+INVERSE_FIELDS = ('sources', 'keys', 'previous')
+
+
+def describe_count(count):
+    return "1 candidate" if count == 1 else f"{count} candidates"
+
+
+def revert_entry(manager, entry):
+    # Undoes a manager event with the state it carries from before it
+    op = entry['op']
+    if op == 'score':
+        manager.score_many(entry['ids'], entry['previous'])
+    elif op == 'order':
+        manager.reorder(entry['bucket'], entry['previous'])
+    elif op == 'move':
+        placed = {}
+        for candidate_id, source, key in zip(entry['ids'], entry['sources'], entry['keys']):
+            ids, keys = placed.setdefault(source, ([], []))
+            ids.append(candidate_id)
+            keys.append(key)
+        for source, (ids, keys) in placed.items():
+            # Back into their old places among the rest of the bucket
+            manager.move(ids, source, keys)
+
+
+def touches(entry, ids):
+    return entry['op'] in ('score', 'move') and not ids.isdisjoint(entry['ids'])
+
+
+class History:
+    # Unlimited undo/redo of scores, decisions, dismissals and orderings. Each
+    # step is the manager's own event, which carries what it replaced (old
+    # scores, source buckets and order keys, the old order), so memory grows
+    # with the edits rather than the pool; a sort keeps the old order but not
+    # the new one, which redo recomputes. Undo and redo are ordinary manager
+    # edits: views and the journal see them through the usual events.
+    # Wholesale changes (imports, loading a state) start a new history.
+    def __init__(self, manager):
+        self.manager = manager
+        self.done = []
+        self.undone = []
+        self.applying = False
+        manager.listeners.append(self.record)
+
+    def record(self, entry):
+        if self.applying:
+            return
+        if entry['op'] == 'reset':
+            self.clear()
+            return
+        self.done.append(entry)
+        self.undone.clear()
+
+    def clear(self):
+        self.done.clear()
+        self.undone.clear()
+
+    def forget(self, ids):
+        # Drops the scores and decisions touching ids (changed from elsewhere,
+        # e.g. another reviewer), so undo cannot put back what they replaced
+        ids = set(ids)
+        if ids:
+            self.done = [entry for entry in self.done if not touches(entry, ids)]
+            self.undone = [entry for entry in self.undone if not touches(entry, ids)]
+
+    def can_undo(self):
+        return bool(self.done)
+
+    def can_redo(self):
+        return bool(self.undone)
+
+    def undo(self):
+        if not self.done:
+            return None
+        entry = self.done.pop()
+        self.apply(self.revert, entry)
+        self.undone.append(entry)
+        return entry
+
+    def redo(self):
+        if not self.undone:
+            return None
+        entry = self.undone.pop()
+        self.apply(self.replay, entry)
+        self.done.append(entry)
+        return entry
+
+    def apply(self, action, entry):
+        self.applying = True
+        try:
+            action(entry)
+        finally:
+            self.applying = False
+
+    def replay(self, entry):
+        op = entry['op']
+        if op == 'score':
+            self.manager.score_many(entry['ids'], entry['scores'])
+        elif op == 'move':
+            self.manager.move(entry['ids'], entry['target'])
+        elif 'spec' in entry:
+            self.manager.sort_by(entry['bucket'], entry['spec'])
+        else:
+            self.manager.reorder(entry['bucket'], entry['ids'])
+
+    def revert(self, entry):
+        revert_entry(self.manager, entry)
+
+    def label(self, entry):
+        op = entry['op']
+        if op == 'score':
+            return f"score {describe_count(len(entry['ids']))}"
+        if op == 'move':
+            target = entry['target']
+            if target == 'Dismissed':
+                return f"dismiss {describe_count(len(entry['ids']))}"
+            if target == 'Available':
+                return f"restore {describe_count(len(entry['ids']))}"
+            return f"{target} for {describe_count(len(entry['ids']))}"
+        return f"order of {entry['bucket']}"
@@ -0,0 +1,405 @@
+import heapq
+import queue
+import re
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from services.schedule import DayIndex, parse_days, parse_ranges
+
+# Candidates that can be staffed, and how much their decision adds to their
+# ranking score
+HIRE_BUCKETS = ['Strong Hire', 'Hire', 'Weak Hire']
+DECISION_BONUS = {'Strong Hire': 3.0, 'Hire': 2.0, 'Weak Hire': 1.0, 'Available': 0.0}
+# auto uses the exact solver while seats x edges stays below this
+EXACT_LIMIT = 2000000
+DAY_LETTERS = {'M': 'Mon', 'T': 'Tue', 'W': 'Wed', 'R': 'Thu', 'F': 'Fri', 'S': 'Sat', 'U': 'Sun'}
+DAY_LETTERS_RE = re.compile(r'^\s*([MTWRFSU]+)\b')
+
+
+class Section:
+    # One section to staff: capacity TAs, meeting at meetings [(day, start, end)]
+    def __init__(self, name, capacity=1, meetings=(), course=None):
+        self.name = name
+        self.capacity = int(capacity)
+        self.meetings = tuple(meetings)
+        self.course = course
+
+
+class Assignment:
+    def __init__(self, sections, weight, method, seconds):
+        # sections: section name -> [candidate ids]
+        self.sections = sections
+        self.weight = weight
+        self.method = method
+        self.seconds = seconds
+
+    def candidates(self):
+        return {candidate_id: name for name, ids in self.sections.items() for candidate_id in ids}
+
+    def seats(self):
+        return sum(len(ids) for ids in self.sections.values())
+
+
+def parse_meetings(text):
+    # "MW 11:00 am - 12:15 pm; F 2 pm - 4:50 pm" -> [(day, start, end), ...]
+    meetings = []
+    if not isinstance(text, str):
+        return meetings
+    for part in re.split(r'[;\n]', text):
+        days = parse_days(part)
+        if not days:
+            letters = DAY_LETTERS_RE.match(part)
+            days = [DAY_LETTERS[letter] for letter in letters.group(1)] if letters else []
+        for start, end in parse_ranges(part):
+            meetings.extend((day, start, end) for day in days)
+    return meetings
+
+
+def load_sections(file_path):
+    # CSV with a section (or name) column, capacity, and optionally course
+    # and meetings
+    df = pd.read_csv(file_path)
+    columns = {col.lower(): col for col in df.columns}
+    name = columns.get('section') or columns.get('name')
+    if name is None:
+        raise ValueError("Sections file needs a 'section' column")
+    sections = []
+    for row in df.to_dict('records'):
+        label = str(row[name])
+        if 'course' in columns and pd.notna(row[columns['course']]):
+            label = f"{row[columns['course']]} {label}"
+        sections.append(Section(
+            label,
+            row[columns['capacity']] if 'capacity' in columns else 1,
+            parse_meetings(row.get(columns.get('meetings'))),
+            row.get(columns.get('course')),
+        ))
+    return sections
+
+
+def candidates_from_manager(manager, ranker, schedule, buckets=None):
+    # Ids, weights and busy intervals of the candidates to staff: ranking score
+    # plus a bonus for the decision, shifted so every weight is positive
+    buckets = HIRE_BUCKETS if buckets is None else buckets
+    ids, bonus = [], []
+    for bucket in buckets:
+        members = list(manager.members[bucket])
+        ids.extend(members)
+        bonus.extend([DECISION_BONUS.get(bucket, 0.0)] * len(members))
+    if not ids:
+        return [], np.zeros(0), {}
+    scores = ranker.scores()[manager.table.index.get_indexer(ids)]
+    weights = scores - scores.min() + 1.0 + np.array(bonus)
+    schedule.sync()
+    busy = {}
+    for session_busy in schedule.busy.values():
+        for candidate_id in ids:
+            intervals = session_busy.get(candidate_id)
+            if intervals:
+                busy.setdefault(candidate_id, []).extend(intervals)
+    return ids, weights, busy
+
+
+class Problem:
+    # Candidates x sections with the pairs ruled out by timetables
+    def __init__(self, ids, weights, busy, sections, bonus=None, max_load=1):
+        self.ids = list(ids)
+        self.weights = np.asarray(weights, dtype=float)
+        self.sections = sections
+        self.capacity = [section.capacity for section in sections]
+        self.bonus = {}
+        positions = {candidate_id: i for i, candidate_id in enumerate(self.ids)}
+        names = {section.name: s for s, section in enumerate(sections)}
+        for (candidate_id, name), extra in (bonus or {}).items():
+            if candidate_id in positions and name in names:
+                self.bonus.setdefault(positions[candidate_id], {})[names[name]] = extra
+        self.max_load = max_load
+
+        per_day = {}
+        for s, section in enumerate(sections):
+            for day, start, end in section.meetings:
+                per_day.setdefault(day, []).append((start, end, s))
+        meetings = {day: DayIndex(intervals) for day, intervals in per_day.items()}
+
+        def overlapping(intervals):
+            found = set()
+            for day, start, end in intervals:
+                if day in meetings:
+                    found |= meetings[day].overlapping(start, end)
+            return found
+
+        # Sections each candidate can't take, only for candidates with clashes
+        self.conflicts = {}
+        for candidate_id, intervals in busy.items():
+            if candidate_id in positions:
+                blocked = overlapping(intervals)
+                if blocked:
+                    self.conflicts[positions[candidate_id]] = blocked
+        # Sections that meet at the same time (only matters above one section each)
+        self.overlaps = [overlapping(section.meetings) - {s} for s, section in enumerate(sections)] \
+            if max_load > 1 else None
+
+    def weight(self, c, s):
+        extra = self.bonus.get(c)
+        return self.weights[c] + (extra.get(s, 0.0) if extra else 0.0)
+
+    def edges(self):
+        return len(self.ids) * len(self.sections) - sum(len(blocked) for blocked in self.conflicts.values())
+
+
+def solve(ids, weights, busy, sections, bonus=None, max_load=1, method='auto',
+          progress=None, cancelled=None, time_limit=None):
+    # Max-weight assignment of candidates to section seats with no timetable
+    # clashes: 'exact' is min-cost flow (one section per candidate), 'greedy'
+    # is weight-ordered greedy followed by local search; 'auto' picks exact
+    # while the problem is small enough for it
+    start = time.perf_counter()
+    problem = Problem(ids, weights, busy, sections, bonus, max_load)
+    seats = sum(problem.capacity)
+    if method == 'auto':
+        method = 'exact' if max_load == 1 and seats * problem.edges() <= EXACT_LIMIT else 'greedy'
+    if method == 'exact':
+        if max_load != 1:
+            raise ValueError("The exact solver assigns at most one section per candidate")
+        members = solve_flow(problem, progress, cancelled)
+    elif method == 'greedy':
+        members = solve_greedy(problem, progress, cancelled, time_limit)
+    else:
+        raise ValueError(f"Unknown method: {method}")
+    result = {section.name: [problem.ids[c] for c in members[s]] for s, section in enumerate(sections)}
+    weight = sum(problem.weight(c, s) for s in range(len(sections)) for c in members[s])
+    return Assignment(result, float(weight), method, time.perf_counter() - start)
+
+
+def solve_flow(problem, progress=None, cancelled=None):
+    # Successive shortest paths with Dijkstra on reduced costs. Nodes:
+    # source, candidates, sections, sink; candidate -> section edges cost
+    # -weight, and augmenting stops once no path has negative cost.
+    n, m = len(problem.ids), len(problem.sections)
+    source, sink = n + m, n + m + 1
+    head = [[] for _ in range(n + m + 2)]
+    to, cap, cost = [], [], []
+
+    def add(u, v, capacity, edge_cost):
+        head[u].append(len(to))
+        to.append(v)
+        cap.append(capacity)
+        cost.append(edge_cost)
+        head[v].append(len(to))
+        to.append(u)
+        cap.append(0)
+        cost.append(-edge_cost)
+
+    potential = [0.0] * (n + m + 2)
+    for c in range(n):
+        add(source, c, 1, 0.0)
+        blocked = problem.conflicts.get(c, ())
+        for s in range(m):
+            if s not in blocked:
+                edge_cost = -problem.weight(c, s)
+                add(c, n + s, 1, edge_cost)
+                potential[n + s] = min(potential[n + s], edge_cost)
+    for s in range(m):
+        add(n + s, sink, problem.capacity[s], 0.0)
+        potential[sink] = min(potential[sink], potential[n + s])
+
+    seats = max(sum(problem.capacity), 1)
+    for flow in range(seats):
+        if cancelled is not None and cancelled():
+            break
+        dist = [float('inf')] * (n + m + 2)
+        parent = [-1] * (n + m + 2)
+        dist[source] = 0.0
+        heap = [(0.0, source)]
+        while heap:
+            d, u = heapq.heappop(heap)
+            if d > dist[u]:
+                continue
+            for e in head[u]:
+                if cap[e] <= 0:
+                    continue
+                v = to[e]
+                nd = d + max(cost[e] + potential[u] - potential[v], 0.0)
+                if nd < dist[v] - 1e-12:
+                    dist[v] = nd
+                    parent[v] = e
+                    heapq.heappush(heap, (nd, v))
+        if dist[sink] == float('inf') or dist[sink] + potential[sink] - potential[source] >= -1e-9:
+            break
+        for v in range(n + m + 2):
+            if dist[v] < float('inf'):
+                potential[v] += dist[v]
+        v = sink
+        while v != source:
+            e = parent[v]
+            cap[e] -= 1
+            cap[e ^ 1] += 1
+            v = to[e ^ 1]
+        if progress is not None:
+            progress((flow + 1) / seats)
+
+    members = [[] for _ in range(m)]
+    for c in range(n):
+        for e in head[c]:
+            if n <= to[e] < n + m and cap[e] == 0 and e % 2 == 0:
+                members[to[e] - n].append(c)
+    return members
+
+
+def solve_greedy(problem, progress=None, cancelled=None, time_limit=None):
+    n, m = len(problem.ids), len(problem.sections)
+    remaining = list(problem.capacity)
+    members = [[] for _ in range(m)]
+    where = [[] for _ in range(n)]
+    no_conflicts = set()
+    # Sections most candidates can't take are filled first, while flexible
+    # candidates are still around
+    blocked_by = [0] * m
+    for blocked in problem.conflicts.values():
+        for s in blocked:
+            blocked_by[s] += 1
+    open_sections = sorted((s for s in range(m) if remaining[s] > 0), key=lambda s: -blocked_by[s])
+
+    def compatible(c, s):
+        if s in problem.conflicts.get(c, no_conflicts) or s in where[c]:
+            return False
+        if problem.overlaps is not None:
+            return not any(s in problem.overlaps[other] for other in where[c])
+        return True
+
+    def first_open(c, skip=None):
+        preferred = problem.bonus.get(c)
+        if preferred:
+            for s in sorted(preferred, key=preferred.get, reverse=True):
+                if remaining[s] > 0 and s != skip and compatible(c, s):
+                    return s
+        for s in open_sections:
+            if remaining[s] > 0 and s != skip and compatible(c, s):
+                return s
+        return None
+
+    def place(c, s):
+        members[s].append(c)
+        where[c].append(s)
+        remaining[s] -= 1
+
+    def unplace(c, s):
+        members[s].remove(c)
+        where[c].remove(s)
+        remaining[s] += 1
+
+    seats = sum(remaining)
+    order = np.argsort(-problem.weights, kind='stable')
+    for step, c in enumerate(order):
+        if seats == 0:
+            break
+        if step % 1024 == 0:
+            if cancelled is not None and cancelled():
+                return members
+            if progress is not None:
+                progress(0.5 * step / n)
+            open_sections = [s for s in open_sections if remaining[s] > 0]
+        for _ in range(problem.max_load):
+            s = first_open(c)
+            if s is None:
+                break
+            place(c, s)
+            seats -= 1
+
+    # Local search: give left-out candidates a seat by moving someone to an
+    # open section, or take the seat of a lighter candidate
+    deadline = None if time_limit is None else time.perf_counter() + time_limit
+    max_bonus = max((max(extra.values()) for extra in problem.bonus.values()), default=0.0)
+    lightest = min((problem.weights[c] for s in range(m) for c in members[s]), default=0.0)
+    pending = [c for c in order if len(where[c]) < problem.max_load]
+    for step, u in enumerate(pending):
+        if step % 256 == 0:
+            if cancelled is not None and cancelled():
+                break
+            if deadline is not None and time.perf_counter() > deadline:
+                break
+            if progress is not None:
+                progress(0.5 + 0.5 * step / max(len(pending), 1))
+            open_sections = [s for s in open_sections if remaining[s] > 0]
+        if len(where[u]) >= problem.max_load:
+            continue
+        has_open = bool(open_sections)
+        if not has_open and problem.weights[u] + max_bonus <= lightest:
+            continue
+        s = first_open(u) if has_open else None
+        if s is not None:
+            place(u, s)
+            continue
+        best = None
+        for s in range(m):
+            if not members[s] or not compatible(u, s):
+                continue
+            for v in members[s]:
+                if has_open:
+                    target = first_open(v, skip=s)
+                    if target is not None:
+                        unplace(v, s)
+                        place(v, target)
+                        place(u, s)
+                        best = 'moved'
+                        break
+                gain = problem.weight(u, s) - problem.weight(v, s)
+                if gain > 1e-9 and (best is None or gain > best[0]):
+                    best = (gain, v, s)
+            if best == 'moved':
+                break
+        if best is not None and best != 'moved':
+            _, v, s = best
+            unplace(v, s)
+            place(u, s)
+            # The displaced candidate may still fit elsewhere later
+            pending.append(v)
+    return members
+
+
+class AssignmentJob:
+    # Runs solve() on a worker thread; the GUI polls `messages` like CsvImport:
+    #   ('progress', fraction) / ('done', Assignment) / ('error', exception)
+    def __init__(self, ids, weights, busy, sections, **options):
+        self.args = (ids, weights, busy, sections)
+        self.options = options
+        self.messages = queue.Queue()
+        self.cancelled = threading.Event()
+        self.thread = threading.Thread(target=self.run, name='assignment', daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def run(self):
+        try:
+            result = solve(*self.args, progress=lambda fraction: self.messages.put(('progress', fraction)),
+                           cancelled=self.cancelled.is_set, **self.options)
+            self.messages.put(('cancelled', None) if self.cancelled.is_set() else ('done', result))
+        except Exception as e:
+            self.messages.put(('error', e))
+
+    def poll(self):
+        items = []
+        while True:
+            try:
+                items.append(self.messages.get_nowait())
+            except queue.Empty:
+                return items
+
+
+def assignment_frame(result, manager=None):
+    rows = []
+    for name, ids in result.sections.items():
+        for candidate_id in ids:
+            row = {'section': name, 'id': candidate_id}
+            if manager is not None and 'Full name' in manager.table.columns:
+                row['Full name'] = manager.table.at[candidate_id, 'Full name']
+            rows.append(row)
+    return pd.DataFrame(rows, columns=['section', 'id'] + (['Full name'] if rows and 'Full name' in rows[0] else []))
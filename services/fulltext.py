@@ -0,0 +1,142 @@
+import math
+import re
+from bisect import bisect_left
+from collections import Counter
+
+TOKEN_RE = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+# Columns filled in by the app rather than by the applicant
+SKIP_COLUMNS = {'Timestamp', 'Interview Score', 'Decision', 'Status'}
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.lower())
+
+
+def text_columns(df):
+    return [col for col in df.columns
+            if col not in SKIP_COLUMNS and (df[col].dtype == object or str(df[col].dtype) in ('str', 'string'))]
+
+
+def match_spans(text, terms):
+    # Character spans of every token in text that matches one of terms (the
+    # last query term also matches as a prefix while it is being typed)
+    if not terms:
+        return []
+    exact = set(terms)
+    prefix = terms[-1]
+    spans = []
+    for match in TOKEN_RE.finditer(text.lower()):
+        token = match.group()
+        if token in exact or token.startswith(prefix):
+            spans.append((match.start(), match.end()))
+    return spans
+
+
+def snippet(text, terms, width=120):
+    # A window of text around the first matching token, with ellipses where
+    # it was cut
+    spans = match_spans(text, terms)
+    if not spans:
+        return None
+    start = max(0, spans[0][0] - width // 3)
+    end = min(len(text), start + width)
+    result = ' '.join(text[start:end].split())
+    if start > 0:
+        result = '...' + result
+    if end < len(text):
+        result = result + '...'
+    return result
+
+
+class FullTextIndex:
+    # Inverted index over the applicants' free-text answers ranked with BM25.
+    # Documents are added or replaced one candidate at a time, so the index
+    # grows with each imported chunk and follows edits.
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self):
+        self.postings = {}
+        self.doc_terms = {}
+        self.lengths = {}
+        self.total_length = 0
+        self.vocabulary = None
+
+    def clear(self):
+        self.__init__()
+
+    def add_frame(self, ids, df):
+        columns = text_columns(df)
+        if not columns:
+            return
+        text = df[columns[0]].fillna('').astype(str)
+        for col in columns[1:]:
+            text = text + '\n' + df[col].fillna('').astype(str)
+        for candidate_id, value in zip(ids, text):
+            self.add(candidate_id, value)
+
+    def add(self, candidate_id, text):
+        if candidate_id in self.doc_terms:
+            self.remove(candidate_id)
+        counts = Counter(tokenize(text))
+        for term, count in counts.items():
+            postings = self.postings.get(term)
+            if postings is None:
+                postings = self.postings[term] = {}
+                self.vocabulary = None
+            postings[candidate_id] = count
+        self.doc_terms[candidate_id] = list(counts)
+        length = sum(counts.values())
+        self.lengths[candidate_id] = length
+        self.total_length += length
+
+    def remove(self, candidate_id):
+        terms = self.doc_terms.pop(candidate_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            postings = self.postings[term]
+            del postings[candidate_id]
+            if not postings:
+                del self.postings[term]
+                self.vocabulary = None
+        self.total_length -= self.lengths.pop(candidate_id)
+
+    def expand(self, prefix):
+        if self.vocabulary is None:
+            self.vocabulary = sorted(self.postings)
+        vocabulary = self.vocabulary
+        i = bisect_left(vocabulary, prefix)
+        terms = []
+        while i < len(vocabulary) and vocabulary[i].startswith(prefix):
+            terms.append(vocabulary[i])
+            i += 1
+        return terms
+
+    def search(self, query, limit=None):
+        # Returns [(candidate_id, score)] best first
+        terms = tokenize(query)
+        if not terms or not self.lengths:
+            return []
+        query_terms = set(terms[:-1])
+        query_terms.update(self.expand(terms[-1]))
+
+        n = len(self.lengths)
+        avg_length = self.total_length / n or 1.0
+        lengths = self.lengths
+        k1 = self.K1
+        b = self.B
+        scores = {}
+        for term in query_terms:
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for candidate_id, tf in postings.items():
+                norm = k1 * (1 - b + b * lengths[candidate_id] / avg_length)
+                scores[candidate_id] = scores.get(candidate_id, 0.0) + idf * tf * (k1 + 1) / (tf + norm)
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        if limit is not None:
+            ranked = ranked[:limit]
+        return ranked
@@ -0,0 +1,64 @@
+import os
+import queue
+import threading
+import pandas as pd
+from models.candidate import CSV_DTYPES
+
+
+class CsvImport:
+    # Parses a CSV on a worker thread in chunks. The GUI polls `messages`
+    # (e.g. from root.after) and receives:
+    #   ('chunk', DataFrame, fraction_done)
+    #   ('done', rows_read) / ('cancelled', rows_read) / ('error', exception)
+    # and, after compact(), ('compacted', manager)
+    def __init__(self, file_path, chunksize=5000):
+        self.file_path = file_path
+        self.chunksize = chunksize
+        self.messages = queue.Queue()
+        self.cancelled = threading.Event()
+        self.thread = threading.Thread(target=self.run, name='csv-import', daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def run(self):
+        rows = 0
+        try:
+            size = os.path.getsize(self.file_path) or 1
+            with open(self.file_path, 'rb') as f:
+                for chunk in pd.read_csv(f, chunksize=self.chunksize, dtype=CSV_DTYPES):
+                    if self.cancelled.is_set():
+                        self.messages.put(('cancelled', rows))
+                        return
+                    rows += len(chunk)
+                    self.messages.put(('chunk', chunk, min(1.0, f.tell() / size)))
+            self.messages.put(('done', rows))
+        except Exception as e:
+            self.messages.put(('error', e))
+
+    def compact(self, manager):
+        # Compaction of the imported rows (a snapshot() of the manager) is
+        # the slow part of finishing an import, so it runs here too; the
+        # GUI swaps the result in with finish_import(compacted)
+        self.thread = threading.Thread(target=self.run_compact, args=(manager,), name='csv-compact', daemon=True)
+        self.thread.start()
+
+    def run_compact(self, manager):
+        try:
+            manager.compact_table()
+            self.messages.put(('compacted', manager))
+        except Exception as e:
+            self.messages.put(('error', e))
+
+    def poll(self):
+        # Everything queued so far, without blocking
+        items = []
+        while True:
+            try:
+                items.append(self.messages.get_nowait())
+            except queue.Empty:
+                return items
@@ -0,0 +1,232 @@
+import json
+import os
+import queue
+import threading
+from models.candidate import CandidateManager
+from models.history import INVERSE_FIELDS
+from services.persistence import load_state, save_state
+from utils.instrumentation import count
+
+
+def to_json(value):
+    # numpy scalars/arrays and pandas Series coming from the manager
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    return str(value)
+
+
+def read_journal(path):
+    if not os.path.exists(path):
+        return
+    with open(path, 'r') as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                # A torn final line from a crash mid-append
+                break
+
+
+def apply_entry(manager, entry):
+    # Every entry sets absolute values, so replaying one that already made it
+    # into the snapshot is harmless
+    op = entry.get('op')
+    known = manager.table.index
+    if op == 'score':
+        ids = entry['ids']
+        scores = entry['scores']
+        if isinstance(scores, list):
+            pairs = [(cid, score) for cid, score in zip(ids, scores) if cid in known]
+            ids = [cid for cid, _ in pairs]
+            scores = [score for _, score in pairs]
+        else:
+            ids = [cid for cid in ids if cid in known]
+        manager.score_many(ids, scores)
+    elif op == 'move':
+        manager.move([cid for cid in entry['ids'] if cid in known], entry['target'])
+    elif op == 'order' and 'spec' in entry:
+        manager.sort_by(entry['bucket'], entry['spec'])
+    elif op == 'order':
+        members = manager.members[entry['bucket']]
+        ids = [cid for cid in entry['ids'] if cid in members]
+        listed = set(ids)
+        ids += [cid for cid in members if cid not in listed]
+        manager.reorder(entry['bucket'], ids)
+
+
+def replay(manager, path, orders=True):
+    count = 0
+    for entry in read_journal(path):
+        if orders or entry.get('op') != 'order':
+            apply_entry(manager, entry)
+        count += 1
+    return count
+
+
+class StateLoad:
+    # Journal.load on a worker thread into a fresh manager, so the window stays
+    # responsive while a large state is read. The GUI polls `messages`:
+    #   ('done', manager) / ('error', exception)
+    def __init__(self, journal, compact=False):
+        self.journal = journal
+        self.manager = CandidateManager(compact=compact)
+        self.messages = queue.Queue()
+        self.thread = threading.Thread(target=self.run, name='state-load', daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def run(self):
+        try:
+            self.journal.load(self.manager)
+            self.messages.put(('done', self.manager))
+        except Exception as e:
+            self.messages.put(('error', e))
+
+    def poll(self):
+        items = []
+        while True:
+            try:
+                items.append(self.messages.get_nowait())
+            except queue.Empty:
+                return items
+
+
+class Journal:
+    # Write-ahead log of manager changes next to the state snapshot. Each
+    # change is appended as one JSON line and fsync'd by a background thread;
+    # every compact_every entries (or on a checkpoint) the thread writes a
+    # fresh snapshot and truncates the log. Loading is load_state followed by
+    # replay of the log.
+    #
+    # Sorts and ranks are logged as their spec. Orders that have no spec
+    # (undoing a sort or a move) are not logged each time; the bucket is
+    # marked and its final order written once, when the next spec'd sort
+    # needs it, on detach/close, or not at all if a snapshot comes first. A
+    # crash loses only those orders.
+    def __init__(self, state_path='ta_management_state.json', compact_every=1000):
+        self.state_path = state_path
+        self.path = state_path + '.journal'
+        self.compact_every = compact_every
+        self.pending = 0
+        # Buckets whose order is only in memory (see above)
+        self.unsaved_orders = set()
+        self.manager = None
+        self.error = None
+        self.queue = queue.Queue()
+        self.thread = None
+
+    def load(self, manager, columns=None):
+        # With columns, only those form columns are read (for a quick look at
+        # a large SQLite/Parquet state); bucket orders, which may be sorted by
+        # columns that were not read, are left as saved
+        load_state(manager, self.state_path, columns)
+        return replay(manager, self.path, orders=columns is None)
+
+    def attach(self, manager, checkpoint=True):
+        # Starts journaling manager's changes from a fresh snapshot (without
+        # one, the caller writes it)
+        self.manager = manager
+        manager.listeners.append(self.record)
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.run, name='autosave', daemon=True)
+            self.thread.start()
+        if checkpoint:
+            self.checkpoint()
+
+    def detach(self):
+        if self.manager is not None:
+            self.write_orders()
+            self.manager.listeners.remove(self.record)
+            self.manager = None
+
+    def record(self, entry):
+        if entry['op'] == 'reset':
+            # Wholesale changes (a new import) go straight to a snapshot
+            self.checkpoint()
+            return
+        bucket = entry.get('bucket')
+        if entry['op'] == 'order' and 'spec' not in entry:
+            self.unsaved_orders.add(bucket)
+            return
+        if entry['op'] == 'order' and bucket in self.unsaved_orders:
+            # The sort starts from the unsaved order, so replay needs it first
+            self.unsaved_orders.discard(bucket)
+            self.queue.put(('entry', {'op': 'order', 'bucket': bucket, 'ids': list(entry['previous'])}, None))
+        if entry.get('placed'):
+            # Put back in place (an undo); replay only appends
+            self.unsaved_orders.add(entry['target'])
+        # Replay only needs the new values; what they replaced is for undo
+        entry = {key: value for key, value in entry.items() if key not in INVERSE_FIELDS and key != 'placed'}
+        self.queue.put(('entry', entry, None))
+        self.pending += 1
+        if self.pending >= self.compact_every:
+            self.checkpoint()
+
+    def write_orders(self):
+        for bucket in self.unsaved_orders:
+            self.queue.put(('entry', {'op': 'order', 'bucket': bucket, 'ids': list(self.manager.members[bucket])}, None))
+        self.unsaved_orders.clear()
+
+    def checkpoint(self, wait=False):
+        done = threading.Event() if wait else None
+        self.pending = 0
+        self.unsaved_orders.clear()
+        self.queue.put(('snapshot', self.manager.snapshot(), done))
+        if wait:
+            done.wait()
+            error, self.error = self.error, None
+            if error is not None:
+                raise error
+
+    def save(self, manager):
+        # Snapshot straight from the calling thread, for one-shot use without
+        # attach (e.g. the command line)
+        save_state(manager, self.state_path)
+        self.truncate()
+
+    def truncate(self):
+        with open(self.path, 'w') as f:
+            os.fsync(f.fileno())
+
+    def close(self):
+        if self.manager is not None:
+            self.write_orders()
+        if self.thread is not None:
+            self.queue.put(('stop', None, None))
+            self.thread.join()
+            self.thread = None
+
+    def run(self):
+        log = None
+        while True:
+            kind, payload, done = self.queue.get()
+            try:
+                if kind == 'stop':
+                    break
+                if kind == 'entry':
+                    if log is None:
+                        log = open(self.path, 'a')
+                    line = json.dumps(payload, default=to_json) + '\n'
+                    log.write(line)
+                    count('journal_bytes', len(line))
+                    # Group commits: fsync once the queue has drained
+                    if self.queue.empty():
+                        log.flush()
+                        os.fsync(log.fileno())
+                elif kind == 'snapshot':
+                    if log is not None:
+                        log.close()
+                        log = None
+                    save_state(payload, self.state_path)
+                    self.truncate()
+            except Exception as e:
+                self.error = e
+            finally:
+                if done is not None:
+                    done.set()
+        if log is not None:
+            log.flush()
+            os.fsync(log.fileno())
+            log.close()
@@ -1,27 +1,166 @@
 import json
 import pandas as pd
 import os
+import sqlite3
+from models.candidate import CSV_DTYPES, ID_COLUMN, ID_FIELD, CandidateManager
+from utils.instrumentation import count, enabled, timed
 
-def save_state(manager, file_path='ta_management_state.json'):
-    state = {
-        'candidates': manager.candidates.to_dict('records') if not manager.candidates.empty else [],
-        'dismissed_candidates': manager.dismissed_candidates.to_dict('records') if not manager.dismissed_candidates.empty else [],
-        'hired_candidates': {}
-    }
-    for decision, df in manager.hired_candidates.items():
-        state['hired_candidates'][decision] = df.to_dict('records') if not df.empty else []
-    with open(file_path, 'w') as f:
-        json.dump(state, f, indent=2)
-
-def load_state(manager, file_path='ta_management_state.json'):
-    if os.path.exists(file_path):
+# Where each candidate sits, stored alongside the form columns
+POSITION_COLUMN = '_position'
+BUCKET_COLUMN = '_bucket'
+
+def typed_table(manager):
+    # Every candidate with its bucket and position in that bucket, with the
+    # interview score as a real numeric column
+    frames = []
+    for bucket, ids in manager.members.items():
+        if not ids:
+            continue
+        df = manager.expanded(manager.table.loc[list(ids)]).copy()
+        df[BUCKET_COLUMN] = bucket
+        df[POSITION_COLUMN] = range(len(df))
+        frames.append(df)
+    if not frames:
+        return pd.DataFrame()
+    df = pd.concat(frames)
+    df['Interview Score'] = pd.to_numeric(df['Interview Score'], errors='coerce')
+    df['Status'] = df['Status'].astype(str)
+    df['Decision'] = df['Decision'].astype(str)
+    df.insert(0, ID_FIELD, df.index.astype(str))
+    return df.reset_index(drop=True)
+
+def set_typed_table(manager, df):
+    buckets = {}
+    if not df.empty:
+        df = df.sort_values([BUCKET_COLUMN, POSITION_COLUMN], kind='stable')
+        for bucket, rows in df.groupby(BUCKET_COLUMN, sort=False):
+            buckets[bucket] = rows.drop(columns=[BUCKET_COLUMN, POSITION_COLUMN]).reset_index(drop=True)
+    manager.set_state(buckets)
+
+def replace_file(tmp_path, file_path):
+    # Swap a fully written file into place so a crash never leaves a
+    # half-written state file behind
+    with open(tmp_path, 'rb') as f:
+        os.fsync(f.fileno())
+    os.replace(tmp_path, file_path)
+
+def records(manager, df):
+    # Rows with their candidate ids, so repeated roll numbers keep their
+    # '#n' suffixes (and journaled changes their rows) across a reload
+    if df.empty:
+        return []
+    return [{ID_FIELD: candidate_id, **row} for candidate_id, row in zip(df.index, manager.expanded(df).to_dict('records'))]
+
+class JsonBackend:
+    def save(self, manager, file_path):
+        state = {
+            'candidates': records(manager, manager.candidates),
+            'dismissed_candidates': records(manager, manager.dismissed_candidates),
+            'hired_candidates': {}
+        }
+        for decision, df in manager.hired_candidates.items():
+            state['hired_candidates'][decision] = records(manager, df)
+        tmp_path = file_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f, indent=2)
+        replace_file(tmp_path, file_path)
+
+    def load(self, manager, file_path, columns=None):
         with open(file_path, 'r') as f:
             state = json.load(f)
-        manager.candidates = pd.DataFrame(state.get('candidates', []))
-        manager.dismissed_candidates = pd.DataFrame(state.get('dismissed_candidates', []))
+        buckets = {
+            'Available': pd.DataFrame(state.get('candidates', [])),
+            'Dismissed': pd.DataFrame(state.get('dismissed_candidates', [])),
+        }
         hired_state = state.get('hired_candidates', {})
-        for decision in manager.hired_candidates.keys():
-            manager.hired_candidates[decision] = pd.DataFrame(hired_state.get(decision, []))
+        for decision, records in hired_state.items():
+            buckets[decision] = pd.DataFrame(records)
+        if columns is not None:
+            keep = set(columns) | {ID_FIELD, ID_COLUMN}
+            buckets = {name: df[[col for col in df.columns if col in keep]] for name, df in buckets.items()}
+        manager.set_state(buckets)
+
+class SQLiteBackend:
+    # One typed 'candidates' table; columns can be read selectively
+    TABLE = 'candidates'
+
+    def save(self, manager, file_path):
+        df = typed_table(manager)
+        tmp_path = file_path + '.tmp'
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        with sqlite3.connect(tmp_path) as conn:
+            if df.empty:
+                conn.execute(f'CREATE TABLE {self.TABLE} ({quote(ID_FIELD)} TEXT)')
+            else:
+                df.to_sql(self.TABLE, conn, index=False)
+            conn.execute(f'CREATE UNIQUE INDEX candidates_id ON {self.TABLE} ({quote(ID_FIELD)})')
+        conn.close()
+        replace_file(tmp_path, file_path)
+
+    def load(self, manager, file_path, columns=None):
+        with sqlite3.connect(file_path) as conn:
+            if columns is None:
+                select = '*'
+            else:
+                wanted = [ID_FIELD] + list(columns) + [BUCKET_COLUMN, POSITION_COLUMN]
+                available = self.columns(conn)
+                select = ', '.join(quote(col) for col in wanted if col in available)
+            df = pd.read_sql(f'SELECT {select} FROM {self.TABLE}', conn)
+        conn.close()
+        set_typed_table(manager, df)
+
+    def columns(self, conn):
+        return [row[1] for row in conn.execute(f'PRAGMA table_info({self.TABLE})')]
+
+class ParquetBackend:
+    # Columnar file; needs the optional pyarrow dependency
+    def save(self, manager, file_path):
+        tmp_path = file_path + '.tmp'
+        typed_table(manager).to_parquet(tmp_path, index=False)
+        replace_file(tmp_path, file_path)
+
+    def load(self, manager, file_path, columns=None):
+        if columns is not None:
+            columns = [ID_FIELD] + list(columns) + [BUCKET_COLUMN, POSITION_COLUMN]
+        set_typed_table(manager, pd.read_parquet(file_path, columns=columns))
+
+def quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+BACKENDS = {
+    '.json': JsonBackend(),
+    '.sqlite': SQLiteBackend(),
+    '.db': SQLiteBackend(),
+    '.parquet': ParquetBackend(),
+}
+
+def backend_for(file_path):
+    ext = os.path.splitext(file_path)[1].lower()
+    if ext not in BACKENDS:
+        raise ValueError(f"Unsupported state file type: {ext or file_path}")
+    return BACKENDS[ext]
+
+@timed('save_state')
+def save_state(manager, file_path='ta_management_state.json'):
+    backend_for(file_path).save(manager, file_path)
+    if enabled():
+        count('bytes_written', os.path.getsize(file_path))
+
+@timed('load_state')
+def load_state(manager, file_path='ta_management_state.json', columns=None):
+    # columns limits which form columns are read (where the backend allows it)
+    if os.path.exists(file_path):
+        backend_for(file_path).load(manager, file_path, columns)
+        if enabled():
+            count('bytes_read', os.path.getsize(file_path))
+
+def migrate_state(source='ta_management_state.json', target='ta_management_state.sqlite'):
+    # One-shot conversion between formats, e.g. the JSON file to SQLite
+    manager = CandidateManager()
+    load_state(manager, source)
+    save_state(manager, target)
+    return manager
 
 def load_candidates_csv(file_path):
-    return pd.read_csv(file_path)
\ No newline at end of file
+    return pd.read_csv(file_path, dtype=CSV_DTYPES)
@@ -0,0 +1,119 @@
+import numpy as np
+import pandas as pd
+from services.schedule import SESSIONS, busy_intervals, find_column, missed_fraction
+
+# Feature -> a part of the column name it is computed from. Every feature is
+# scaled to 0..1 (penalties to -1..0) so the weights are comparable.
+FEATURE_COLUMNS = {
+    'cgpa': 'current cgpa',
+    'cs200': 'grade in cs 200',
+    'cs202': 'grade in cs 202',
+    'interview': 'interview score',
+}
+# Clash penalties: the share of a session (see services.schedule) missed
+CLASH_FEATURES = {'lecture_clash': 'lecture', 'lab_clash': 'lab'}
+FEATURE_LABELS = {
+    'cgpa': 'CGPA',
+    'cs200': 'CS 200 grade',
+    'cs202': 'CS 202 grade',
+    'interview': 'Interview score',
+    'lecture_clash': 'Lecture clash penalty',
+    'lab_clash': 'Lab clash penalty',
+}
+SCALE = {'cgpa': 4.0, 'cs200': 4.0, 'cs202': 4.0, 'interview': 10.0}
+DEFAULT_WEIGHTS = {
+    'cgpa': 1.0,
+    'cs200': 1.0,
+    'cs202': 0.5,
+    'interview': 2.0,
+    'lecture_clash': 0.5,
+    'lab_clash': 1.0,
+}
+
+
+def clash_penalty(attend, clash, session):
+    # Parsed once per distinct pair of answers
+    pairs = pd.Series(list(zip(attend, clash)))
+    codes, uniques = pd.factorize(pairs)
+    missed = np.array([missed_fraction(busy_intervals(a, c, session), session) for a, c in uniques])
+    return -missed[codes]
+
+
+class Ranker:
+    # Weighted composite score over the whole pool. Feature vectors are cached
+    # against the manager's sort keys for their columns (which the manager
+    # drops whenever a column changes) and the composite against the weights, so
+    # tweaking weights costs one matrix-vector product.
+    def __init__(self, manager, weights=None):
+        self.manager = manager
+        self.weights = dict(DEFAULT_WEIGHTS if weights is None else weights)
+        self.features = {}
+        self.cached = None
+
+    def columns(self, feature):
+        columns = self.manager.table.columns
+        if feature in CLASH_FEATURES:
+            session = SESSIONS[CLASH_FEATURES[feature]]
+            return [find_column(columns, session.attend), find_column(columns, session.clash)]
+        return [find_column(columns, FEATURE_COLUMNS[feature])]
+
+    def feature(self, feature):
+        table = self.manager.table
+        columns = self.columns(feature)
+        if all(col is None for col in columns):
+            return np.zeros(len(table)), ()
+        tokens = tuple(self.manager.sort_key(col) if col else None for col in columns)
+        cached = self.features.get(feature)
+        if cached is not None and all(a is b for a, b in zip(cached[0], tokens)):
+            return cached[1], tokens
+        if feature in CLASH_FEATURES:
+            missing = [None] * len(table)
+            # Full answers: a compact table holds only previews of long ones
+            answers = self.manager.expanded(table[[col for col in columns if col]])
+            values = clash_penalty(*[answers[col] if col else missing for col in columns],
+                                   SESSIONS[CLASH_FEATURES[feature]])
+        elif feature in ('cs200', 'cs202'):
+            # Grade sort keys already are GRADE_MAP points
+            values = np.nan_to_num(tokens[0].to_numpy(dtype=float), nan=0.0) / SCALE[feature]
+        else:
+            numbers = pd.to_numeric(table[columns[0]], errors='coerce').to_numpy(dtype=float)
+            values = np.nan_to_num(numbers, nan=0.0) / SCALE[feature]
+        self.features[feature] = (tokens, values)
+        return values, tokens
+
+    def scores(self):
+        # Composite score per candidate, aligned with manager.table.index
+        names = [name for name, weight in self.weights.items() if weight]
+        weights = np.array([self.weights[name] for name in names])
+        features = [self.feature(name) for name in names]
+        tokens = [token for _, feature_tokens in features for token in feature_tokens]
+        key = (len(self.manager.table), tuple(names), tuple(weights))
+        if self.cached is not None and self.cached[0] == key and len(self.cached[1]) == len(tokens) \
+                and all(a is b for a, b in zip(self.cached[1], tokens)):
+            return self.cached[2]
+        if features:
+            scores = np.column_stack([values for values, _ in features]) @ weights
+        else:
+            scores = np.zeros(len(self.manager.table))
+        self.cached = (key, tokens, scores)
+        return scores
+
+    def bucket_scores(self, bucket):
+        ids = list(self.manager.members[bucket])
+        positions = self.manager.table.index.get_indexer(ids)
+        return ids, self.scores()[positions]
+
+    def top(self, k, bucket='Available'):
+        # The k best (id, score) pairs, best first, without sorting the rest
+        ids, scores = self.bucket_scores(bucket)
+        if k < len(ids):
+            best = np.argpartition(-scores, k - 1)[:k]
+        else:
+            best = np.arange(len(ids))
+        best = best[np.argsort(-scores[best], kind='stable')]
+        return [(ids[i], float(scores[i])) for i in best]
+
+    def rank_bucket(self, bucket='Available'):
+        ids, scores = self.bucket_scores(bucket)
+        order = np.argsort(-scores, kind='stable')
+        self.manager.reorder(bucket, [ids[i] for i in order], {'rank': dict(self.weights)})
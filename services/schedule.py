@@ -0,0 +1,213 @@
+import re
+from bisect import bisect_left, bisect_right
+
+DAYS = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+DAY_RE = re.compile(r'\b(mon(?:day)?|tue(?:s(?:day)?)?|wed(?:nesday)?|thu(?:r(?:s(?:day)?)?)?|fri(?:day)?'
+                    r'|sat(?:urday)?|sun(?:day)?|mw)\b', re.IGNORECASE)
+TIME_RANGE_RE = re.compile(r'\b(\d{1,2})(?:[:.](\d{2}))?\s*(am|pm)?\s*(?:to|-|–|till|until)\s*'
+                           r'(\d{1,2})(?:[:. ](\d{2})(?!\d))?\s*(am|pm)?', re.IGNORECASE)
+NO_CLASH_RE = re.compile(r"^\s*no\b|\bno clash|\bdon[’']?t (?:have|expect|anticipate)|\bwon[’']?t have",
+                         re.IGNORECASE)
+FULL_CLASH_RE = re.compile(r'\b(?:fully|full|whole|entire|complete|completely)\b', re.IGNORECASE)
+
+
+class Session:
+    # A weekly teaching slot and the form questions about it; times are
+    # minutes after midnight
+    def __init__(self, name, days, start, end, attend, clash):
+        self.name = name
+        self.days = days
+        self.start = start
+        self.end = end
+        self.attend = attend
+        self.clash = clash
+
+    def minutes(self):
+        return (self.end - self.start) * len(self.days)
+
+    def whole(self):
+        return tuple((day, self.start, self.end) for day in self.days)
+
+
+SESSIONS = {
+    'lecture': Session('lecture', ('Mon', 'Wed'), 11 * 60, 12 * 60 + 15, 'attend the lectures', 'clash with the lecture'),
+    'lab': Session('lab', ('Fri',), 14 * 60, 16 * 60 + 50, 'attend the lab', 'clash with the lab'),
+}
+
+
+def clock(hour, minute, meridiem):
+    # Without am/pm (or with an obvious slip like "12:15 am") anything before
+    # 7 o'clock is taken as the afternoon, since classes run 8 am to 7 pm
+    minutes = int(hour) % 12 * 60 + int(minute or 0)
+    if (meridiem or '').lower() == 'pm' or minutes < 7 * 60:
+        minutes += 12 * 60
+    return minutes
+
+
+def parse_days(text):
+    days = []
+    for match in DAY_RE.findall(text):
+        match = match.lower()
+        names = ['Mon', 'Wed'] if match == 'mw' else [match[:3].capitalize()]
+        days.extend(day for day in names if day not in days)
+    return days
+
+
+def parse_ranges(text):
+    ranges = []
+    for h1, m1, p1, h2, m2, p2 in TIME_RANGE_RE.findall(text):
+        start = clock(h1, m1, p1 or p2)
+        end = clock(h2, m2, p2 or p1)
+        if start < end:
+            ranges.append((start, end))
+    return ranges
+
+
+def parse_clash(text, session):
+    # Busy intervals (day, start, end) within the session described by a
+    # free-text clash answer, () for "no clash", or None when the answer says
+    # nothing usable (e.g. "not enrolled yet")
+    if not isinstance(text, str) or not text.strip():
+        return None
+    if NO_CLASH_RE.search(text):
+        return ()
+    if FULL_CLASH_RE.search(text):
+        return session.whole()
+    ranges = parse_ranges(text)
+    if not ranges:
+        return None
+    days = parse_days(text)
+    days = [day for day in session.days if day in days] if days else list(session.days)
+    busy = []
+    for day in days:
+        for start, end in ranges:
+            start, end = max(start, session.start), min(end, session.end)
+            if start < end:
+                busy.append((day, start, end))
+    return tuple(busy)
+
+
+def busy_intervals(attend, text, session):
+    # Combines the Yes/No question with the clash answer. Someone who can't
+    # attend and gives no readable time is taken to miss the whole session.
+    attend = attend.strip().lower() if isinstance(attend, str) else ''
+    if attend.startswith('y'):
+        return ()
+    busy = parse_clash(text, session)
+    if busy is None:
+        return session.whole() if attend.startswith('n') else ()
+    return busy
+
+
+def missed_fraction(busy, session):
+    return sum(end - start for _, start, end in busy) / session.minutes()
+
+
+def find_column(columns, part):
+    for col in columns:
+        if part in col.lower():
+            return col
+    return None
+
+
+class DayIndex:
+    # Busy intervals of one day sorted by start. Intervals are never longer
+    # than the session, so an overlap query only looks at starts within that
+    # distance of the window: O(log n + matches).
+    def __init__(self, intervals):
+        intervals = sorted(intervals)
+        self.starts = [start for start, _, _ in intervals]
+        self.intervals = intervals
+        self.longest = max((end - start for start, end, _ in intervals), default=0)
+
+    def overlapping(self, start, end):
+        lo = bisect_right(self.starts, start - self.longest)
+        hi = bisect_left(self.starts, end)
+        return {candidate_id for _, busy_end, candidate_id in self.intervals[lo:hi] if busy_end > start}
+
+
+class ScheduleIndex:
+    # Parsed clash answers for every candidate plus a per-day interval index.
+    # Answers are parsed once per distinct (attend, clash) pair; sync() only
+    # rescans when the manager has changed one of the columns involved.
+    def __init__(self, manager, sessions=None):
+        self.manager = manager
+        self.sessions = dict(SESSIONS if sessions is None else sessions)
+        self.parsed = {name: {} for name in self.sessions}
+        self.busy = {name: {} for name in self.sessions}
+        self.days = {name: {} for name in self.sessions}
+        self.tokens = {}
+
+    def sync(self):
+        table = self.manager.table
+        for name, session in self.sessions.items():
+            attend = find_column(table.columns, session.attend)
+            clash = find_column(table.columns, session.clash)
+            tokens = tuple(self.manager.sort_key(col) if col else None for col in (attend, clash))
+            cached = self.tokens.get(name)
+            if cached is not None and all(a is b for a, b in zip(cached, tokens)):
+                continue
+            self.tokens[name] = tokens
+            parsed = self.parsed[name]
+            # Full answers: a compact table holds only previews of long ones
+            answered = self.manager.expanded(table[[col for col in (attend, clash) if col]])
+            answers = zip(answered[attend] if attend else [None] * len(table),
+                          answered[clash] if clash else [None] * len(table))
+            busy = {}
+            for candidate_id, answer in zip(table.index, answers):
+                intervals = parsed.get(answer)
+                if intervals is None:
+                    intervals = parsed[answer] = busy_intervals(answer[0], answer[1], session)
+                if intervals:
+                    busy[candidate_id] = intervals
+            self.busy[name] = busy
+            per_day = {}
+            for candidate_id, intervals in busy.items():
+                for day, start, end in intervals:
+                    per_day.setdefault(day, []).append((start, end, candidate_id))
+            self.days[name] = {day: DayIndex(intervals) for day, intervals in per_day.items()}
+        return self
+
+    def intervals(self, candidate_id, session='lab'):
+        return self.sync().busy[session].get(candidate_id, ())
+
+    def clashing(self, session, day=None, start=None, end=None):
+        # Ids busy at some point of the window (default: the whole session)
+        self.sync()
+        spec = self.sessions[session]
+        start = spec.start if start is None else start
+        end = spec.end if end is None else end
+        clashing = set()
+        for day in ([day] if day else spec.days):
+            index = self.days[session].get(day)
+            if index is not None:
+                clashing |= index.overlapping(start, end)
+        return clashing
+
+    def available(self, session, day=None, start=None, end=None, bucket=None):
+        # Candidates (of a bucket, or everyone) free for the whole window,
+        # e.g. available('lab') is who can cover the full Friday lab
+        ids = self.manager.members[bucket] if bucket else self.manager.table.index
+        clashing = self.clashing(session, day, start, end)
+        return [candidate_id for candidate_id in ids if candidate_id not in clashing]
+
+    def slot_counts(self, session, step=30, bucket=None):
+        # [(day, start, end, free)] for each step-minute slot of the session
+        self.sync()
+        spec = self.sessions[session]
+        pool = self.manager.members[bucket] if bucket else None
+        total = len(pool) if pool is not None else len(self.manager.table)
+        counts = []
+        for day in spec.days:
+            for start in range(spec.start, spec.end, step):
+                end = min(start + step, spec.end)
+                clashing = self.days[session][day].overlapping(start, end) if day in self.days[session] else set()
+                if pool is not None:
+                    clashing = {candidate_id for candidate_id in clashing if candidate_id in pool}
+                counts.append((day, start, end, total - len(clashing)))
+        return counts
+
+
+def format_time(minutes):
+    hour, minute = divmod(minutes, 60)
+    return f"{(hour - 1) % 12 + 1}:{minute:02d} {'pm' if hour >= 12 else 'am'}"
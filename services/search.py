@@ -0,0 +1,84 @@
+def search_columns(columns):
+    # Same heuristic the search box has always used: the name column plus the
+    # roll number (or id) column
+    name_col = None
+    id_col = None
+    for col in columns:
+        if "name" in col.lower():
+            name_col = col
+        if "roll" in col.lower() or "id" in col.lower():
+            id_col = col
+    return [col for col in (name_col, id_col) if col]
+
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class SearchIndex:
+    # Lowercased name/roll text per candidate id plus a trigram -> ids map.
+    # A query is answered by intersecting the trigram sets and confirming the
+    # substring; a query that extends the previous one only re-checks the
+    # previous matches.
+    def __init__(self):
+        self.texts = {}
+        self.grams = {}
+        self.last_query = None
+        self.last_result = None
+
+    def clear(self):
+        self.texts = {}
+        self.grams = {}
+        self.forget()
+
+    def forget(self):
+        self.last_query = None
+        self.last_result = None
+
+    def add_frame(self, ids, df):
+        columns = search_columns(df.columns)
+        if not columns:
+            return
+        text = df[columns[0]].fillna('').astype(str).str.lower()
+        for col in columns[1:]:
+            # Newline keeps a match from spanning the name and roll number
+            text = text + '\n' + df[col].fillna('').astype(str).str.lower()
+        for candidate_id, value in zip(ids, text):
+            self.add(candidate_id, value)
+
+    def add(self, candidate_id, text):
+        if candidate_id in self.texts:
+            self.remove(candidate_id)
+        self.texts[candidate_id] = text
+        for gram in trigrams(text):
+            self.grams.setdefault(gram, set()).add(candidate_id)
+        self.forget()
+
+    def remove(self, candidate_id):
+        text = self.texts.pop(candidate_id, None)
+        if text is None:
+            return
+        for gram in trigrams(text):
+            ids = self.grams.get(gram)
+            if ids is not None:
+                ids.discard(candidate_id)
+                if not ids:
+                    del self.grams[gram]
+        self.forget()
+
+    def search(self, query):
+        query = query.strip().lower()
+        if not query:
+            return None
+        if self.last_query is not None and self.last_query in query:
+            pool = self.last_result
+        elif len(query) >= 3:
+            sets = sorted((self.grams.get(gram, set()) for gram in trigrams(query)), key=len)
+            pool = set(sets[0]).intersection(*sets[1:])
+        else:
+            pool = self.texts.keys()
+        texts = self.texts
+        result = {candidate_id for candidate_id in pool if query in texts[candidate_id]}
+        self.last_query = query
+        self.last_result = result
+        return result
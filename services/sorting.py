@@ -1,4 +1,50 @@
+import numpy as np
+import pandas as pd
+from utils.grade_map import GRADE_MAP
+
+YES_NO = {'yes': 1.0, 'no': 0.0}
+
+
+def is_grade_column(column):
+    return column.lower().startswith('grade in')
+
+
+def sort_key(series, column=None):
+    # Typed float key for a column: grades through GRADE_MAP, numbers as
+    # floats, Yes/No answers as 1/0 and anything else by its lowercased text.
+    # Missing values become NaN, which sorts last in either direction.
+    column = series.name if column is None else column
+    if isinstance(column, str) and is_grade_column(column):
+        grades = series.astype(object).where(series.notna(), '').astype(str).str.strip().str.upper()
+        return grades.map(GRADE_MAP).astype(float).to_numpy()
+
+    blank = series.isna() | (series.astype(str).str.strip() == '')
+    numbers = pd.to_numeric(series, errors='coerce')
+    if not (numbers.isna() & ~blank).any():
+        return numbers.astype(float).to_numpy()
+
+    text = series.astype(str).str.strip().str.lower()
+    if text[~blank].isin(YES_NO.keys()).all():
+        return text.map(YES_NO).where(~blank).astype(float).to_numpy()
+
+    codes, uniques = pd.factorize(text.where(~blank), sort=True)
+    keys = codes.astype(float)
+    keys[codes < 0] = np.nan
+    return keys
+
+
+def sort_order(keys, ascending_order):
+    # Row order for a multi-key sort; the first key is the primary one
+    if not keys:
+        return np.arange(0)
+    if isinstance(ascending_order, bool):
+        ascending_order = [ascending_order] * len(keys)
+    columns = [key if ascending else -key for key, ascending in zip(keys, ascending_order)]
+    return np.lexsort(columns[::-1])
+
+
 def sort_candidates(df, sort_columns, ascending_order):
     if not sort_columns:
         return df
-    return df.sort_values(by=sort_columns, ascending=ascending_order).reset_index(drop=True)
\ No newline at end of file
+    keys = [sort_key(df[col], col) for col in sort_columns]
+    return df.iloc[sort_order(keys, ascending_order)].reset_index(drop=True)
@@ -0,0 +1,394 @@
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from models.candidate import CandidateManager
+from models.history import revert_entry
+from services.journal import Journal, apply_entry, to_json
+from services.persistence import load_state, save_state
+
+# A shared pool for several reviewers on one machine (or a trusted network).
+# The server owns the state: a SQLite log of every score and decision with
+# a version per candidate, plus a snapshot it hands to clients on connect.
+#
+#   GET  /snapshot                 {"path", "seq", "versions"}: load path, then
+#                                  apply changes after seq
+#   POST /changes                  {"entry", "versions", "client"}: applied if
+#                                  every candidate is still at the version the
+#                                  client saw, else 409 with the current ones
+#   GET  /changes?since=N&wait=S   changes after N, waiting up to S seconds
+#                                  for one to arrive (long poll)
+#
+# Bucket order is each reviewer's own view and is not shared. The pool starts
+# as the state file and is saved back to it when the server stops.
+DEFAULT_PORT = 8765
+SHARED_OPS = ('score', 'move')
+LONG_POLL_SECONDS = 25
+
+
+def entry_ids(entry):
+    return [str(candidate_id) for candidate_id in entry['ids']]
+
+
+class StateServer:
+    def __init__(self, state_path, host='127.0.0.1', port=DEFAULT_PORT, snapshot_every=1000):
+        self.state_path = state_path
+        self.db_path = state_path + '.server.sqlite'
+        # SQLite whatever format the state file is in
+        self.snapshot_path = os.path.abspath(state_path + '.server-snapshot.sqlite')
+        self.snapshot_every = snapshot_every
+        self.manager = CandidateManager()
+        self.versions = {}
+        self.seq = 0
+        self.snapshot_seq = 0
+        self.lock = threading.Condition()
+        self.snapshot_lock = threading.Lock()
+        self.db = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.db.executescript(
+            'CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);'
+            'CREATE TABLE IF NOT EXISTS changes (seq INTEGER PRIMARY KEY, change TEXT);'
+            'CREATE TABLE IF NOT EXISTS versions (id TEXT PRIMARY KEY, version INTEGER);'
+        )
+        self.open()
+        self.httpd = ThreadingHTTPServer((host, port), handler_for(self))
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    def open(self):
+        meta = dict(self.db.execute('SELECT key, value FROM meta'))
+        if 'snapshot_seq' in meta and os.path.exists(self.snapshot_path):
+            load_state(self.manager, self.snapshot_path)
+            self.snapshot_seq = int(meta['snapshot_seq'])
+        else:
+            # The pool as the GUI or command line last left it
+            Journal(self.state_path).load(self.manager)
+        for seq, change in self.db.execute('SELECT seq, change FROM changes WHERE seq > ? ORDER BY seq',
+                                           (self.snapshot_seq,)):
+            apply_entry(self.manager, json.loads(change)['entry'])
+        self.seq = self.db.execute('SELECT COALESCE(MAX(seq), 0) FROM changes').fetchone()[0]
+        self.versions = dict(self.db.execute('SELECT id, version FROM versions'))
+        # Clients check it to notice a restart that began a new log
+        self.session = meta.get('session') or uuid.uuid4().hex
+        with self.db:
+            self.db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('session', ?)", (self.session,))
+        if self.seq > self.snapshot_seq or 'snapshot_seq' not in meta:
+            self.write_snapshot()
+
+    def submit(self, entry, versions, client=None):
+        # (status, reply) for a client's change
+        if entry.get('op') not in SHARED_OPS:
+            return 400, {'error': f"unsupported op: {entry.get('op')}"}
+        ids = entry_ids(entry)
+        unknown = [candidate_id for candidate_id in ids if candidate_id not in self.manager.table.index]
+        if unknown:
+            return 400, {'error': 'unknown candidates', 'ids': unknown}
+        with self.lock:
+            conflicts = {candidate_id: self.versions.get(candidate_id, 0) for candidate_id in ids
+                         if self.versions.get(candidate_id, 0) != versions.get(candidate_id, 0)}
+            if conflicts:
+                return 409, {'conflicts': conflicts, 'seq': self.seq}
+            apply_entry(self.manager, entry)
+            new_versions = {candidate_id: self.versions.get(candidate_id, 0) + 1 for candidate_id in ids}
+            self.seq += 1
+            change = {'seq': self.seq, 'entry': entry, 'versions': new_versions, 'client': client}
+            with self.db:
+                self.db.execute('INSERT INTO changes (seq, change) VALUES (?, ?)',
+                                (self.seq, json.dumps(change, default=to_json)))
+                self.db.executemany('INSERT OR REPLACE INTO versions (id, version) VALUES (?, ?)',
+                                    new_versions.items())
+            self.versions.update(new_versions)
+            self.lock.notify_all()
+            due = self.seq - self.snapshot_seq >= self.snapshot_every
+        if due:
+            self.write_snapshot()
+        return 200, {'seq': self.seq, 'versions': new_versions}
+
+    def changes(self, since, wait=0.0):
+        deadline = time.monotonic() + wait
+        with self.lock:
+            while self.seq <= since:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self.lock.wait(remaining)
+            rows = self.db.execute('SELECT change FROM changes WHERE seq > ? ORDER BY seq', (since,)).fetchall()
+            return {'changes': [json.loads(change) for change, in rows], 'seq': self.seq, 'session': self.session}
+
+    def snapshot(self):
+        with self.lock:
+            stale = self.seq > self.snapshot_seq
+        if stale:
+            self.write_snapshot()
+        with self.lock:
+            return {'path': self.snapshot_path, 'seq': self.snapshot_seq, 'session': self.session,
+                    'versions': {candidate_id: version for candidate_id, version in self.versions.items()}}
+
+    def write_snapshot(self):
+        # Copied under the lock, written outside it so edits keep flowing;
+        # versions are taken with the copy so they match its contents
+        with self.snapshot_lock:
+            with self.lock:
+                copy = self.manager.snapshot()
+                seq = self.seq
+            save_state(copy, self.snapshot_path)
+            with self.lock:
+                with self.db:
+                    self.db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('snapshot_seq', ?)", (str(seq),))
+                self.snapshot_seq = seq
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name='state-server', daemon=True)
+        self.thread.start()
+        return self
+
+    def serve_forever(self):
+        try:
+            self.httpd.serve_forever()
+        finally:
+            self.close()
+
+    def close(self):
+        if self.thread is not None:
+            self.httpd.shutdown()
+            self.thread.join()
+            self.thread = None
+        self.httpd.server_close()
+        # The state file gets the session's changes; the log and snapshot are
+        # only kept after a crash, to carry on from them on the next start
+        Journal(self.state_path).save(self.manager)
+        self.db.close()
+        for path in (self.db_path, self.snapshot_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def handler_for(server):
+    class Handler(BaseHTTPRequestHandler):
+        def reply(self, status, payload):
+            body = json.dumps(payload, default=to_json).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            url = urllib.parse.urlsplit(self.path)
+            query = urllib.parse.parse_qs(url.query)
+            try:
+                if url.path == '/snapshot':
+                    self.reply(200, server.snapshot())
+                elif url.path == '/changes':
+                    since = int(query.get('since', ['0'])[0])
+                    wait = min(float(query.get('wait', ['0'])[0]), LONG_POLL_SECONDS)
+                    self.reply(200, server.changes(since, wait))
+                else:
+                    self.reply(404, {'error': 'not found'})
+            except ValueError as e:
+                self.reply(400, {'error': str(e)})
+
+        def do_POST(self):
+            if urllib.parse.urlsplit(self.path).path != '/changes':
+                self.reply(404, {'error': 'not found'})
+                return
+            try:
+                request = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+                status, payload = server.submit(request['entry'], request.get('versions', {}), request.get('client'))
+            except (ValueError, KeyError) as e:
+                status, payload = 400, {'error': str(e)}
+            self.reply(status, payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+class StateClient:
+    # Keeps a CandidateManager in step with a StateServer. Local scores and
+    # decisions are queued as they happen and sent in order by a sender
+    # thread. One the server rejects (another reviewer changed those
+    # candidates first) is undone by a later apply_remote(), which also
+    # applies the other reviewers' changes; those are fetched by a
+    # long-polling thread, but applied only by apply_remote() on the caller's
+    # (GUI) thread, through the manager like any other edit. apply_remote()
+    # waits until every queued change has its answer, so undoing a rejected
+    # change never lands on top of a newer one from the server.
+    def __init__(self, manager, url, history=None):
+        self.manager = manager
+        self.url = url.rstrip('/')
+        self.history = history
+        self.client = uuid.uuid4().hex
+        self.versions = {}
+        self.seq = 0
+        self.session = None
+        self.applying = False
+        self.incoming = []
+        self.lock = threading.Lock()
+        self.outgoing = queue.Queue()
+        self.sending = 0
+        self.rejected = []
+        self.conflicts = []
+        self.error = None
+        self.stopped = threading.Event()
+        self.thread = None
+        self.sender = None
+
+    def request(self, path, payload=None, timeout=10):
+        data = None if payload is None else json.dumps(payload, default=to_json).encode()
+        request = urllib.request.Request(self.url + path, data=data, headers={'Content-Type': 'application/json'})
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                return response.status, json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            return e.code, json.loads(e.read() or b'{}')
+
+    def connect(self):
+        status, snapshot = self.request('/snapshot')
+        if status != 200:
+            raise ConnectionError(f"State server: {snapshot.get('error', status)}")
+        # A reset: views, indexes and the undo history start over
+        load_state(self.manager, snapshot['path'])
+        self.versions = snapshot['versions']
+        self.seq = snapshot['seq']
+        self.session = snapshot['session']
+        self.incoming = self.request(f'/changes?since={self.seq}')[1]['changes']
+        self.apply_remote()
+        self.manager.listeners.append(self.on_change)
+        self.thread = threading.Thread(target=self.listen, name='state-client', daemon=True)
+        self.thread.start()
+        self.sender = threading.Thread(target=self.send, name='state-sender', daemon=True)
+        self.sender.start()
+        return self
+
+    def close(self):
+        self.stopped.set()
+        if self.on_change in self.manager.listeners:
+            self.manager.listeners.remove(self.on_change)
+        if self.sender is not None:
+            # Changes already made still go to the server
+            self.outgoing.put(None)
+            self.sender.join()
+            self.sender = None
+
+    def on_change(self, entry):
+        if self.applying or entry['op'] not in SHARED_OPS:
+            return
+        with self.lock:
+            self.sending += 1
+        self.outgoing.put(entry)
+
+    def send(self):
+        while True:
+            entry = self.outgoing.get()
+            if entry is None:
+                return
+            status, reply = None, {'error': self.error}
+            if self.error is None:
+                # Versions as of the changes applied here so far: remote ones
+                # wait in apply_remote() while this queue is busy
+                shared = {key: entry[key] for key in ('op', 'ids', 'scores', 'target') if key in entry}
+                try:
+                    status, reply = self.request('/changes', {
+                        'entry': shared, 'client': self.client,
+                        'versions': {candidate_id: self.versions.get(candidate_id, 0)
+                                     for candidate_id in entry_ids(entry)},
+                    })
+                except OSError as e:
+                    status, reply = None, {'error': str(e)}
+            with self.lock:
+                if status == 200:
+                    self.versions.update(reply['versions'])
+                else:
+                    self.rejected.append(entry)
+                    if status == 409:
+                        self.conflicts.extend(reply['conflicts'])
+                    elif self.error is None:
+                        self.error = reply.get('error', status)
+                self.sending -= 1
+
+    def listen(self):
+        since = self.seq
+        while not self.stopped.is_set():
+            try:
+                status, reply = self.request(f'/changes?since={since}&wait={LONG_POLL_SECONDS}',
+                                             timeout=LONG_POLL_SECONDS + 10)
+            except OSError:
+                # Server restarting; keep trying
+                self.stopped.wait(1.0)
+                continue
+            if status != 200:
+                self.stopped.wait(1.0)
+                continue
+            if reply['session'] != self.session:
+                self.error = 'restarted with a new log, reconnect'
+                return
+            if reply['changes']:
+                with self.lock:
+                    self.incoming.extend(reply['changes'])
+                since = reply['changes'][-1]['seq']
+
+    def apply_remote(self):
+        # Undoes rejected local changes, then applies the changes fetched so
+        # far; returns how many changes (of either kind) touched the manager.
+        # Nothing happens while local changes still wait for the server.
+        with self.lock:
+            if self.sending:
+                return 0
+            changes, self.incoming = self.incoming, []
+            rejected, self.rejected = self.rejected, []
+        if not changes and not rejected:
+            return 0
+        self.applying = True
+        history_applying = self.history.applying if self.history is not None else None
+        if self.history is not None:
+            # Neither kind is the reviewer's own edit to undo
+            self.history.applying = True
+            self.history.done = [entry for entry in self.history.done if all(entry is not r for r in rejected)]
+        try:
+            for entry in reversed(rejected):
+                revert_entry(self.manager, entry)
+            return len(rejected) + self.apply_changes(changes)
+        finally:
+            self.applying = False
+            if self.history is not None:
+                self.history.applying = history_applying
+                # Undoing an edit to a candidate changed since would silently
+                # wipe the newer change
+                self.history.forget(candidate_id for entry in rejected for candidate_id in entry['ids'])
+
+    def apply_changes(self, changes):
+        applied = 0
+        applying, self.applying = self.applying, True
+        try:
+            for change in changes:
+                if change['seq'] <= self.seq:
+                    continue
+                self.seq = change['seq']
+                self.versions.update(change['versions'])
+                if change.get('client') == self.client:
+                    continue
+                apply_entry(self.manager, change['entry'])
+                if self.history is not None:
+                    self.history.forget(change['entry']['ids'])
+                applied += 1
+        finally:
+            self.applying = applying
+        return applied
+
+    def take_conflicts(self):
+        conflicts, self.conflicts = self.conflicts, []
+        return conflicts
@@ -0,0 +1,24 @@
+from benchmarks.synthetic import generate
+from models.candidate import CandidateManager
+from services.ranking import Ranker
+from services.schedule import SESSIONS, ScheduleIndex, find_column
+
+
+def test_clash_answers_read_in_full_when_compact():
+    # Times past the 60-character preview a compact table keeps
+    df = generate(100)
+    session = SESSIONS['lab']
+    df[find_column(df.columns, session.attend)] = 'No'
+    df[find_column(df.columns, session.clash)] = [
+        'Sorry, I have a weekly family commitment on Friday afternoons, so I will be busy from '
+        + ('2pm to 3pm' if i % 2 else '3:30pm to 4:45pm') for i in range(len(df))]
+    results = []
+    for compact in (False, True):
+        manager = CandidateManager(compact=compact)
+        manager.begin_import()
+        manager.append_candidates(df)
+        manager.finish_import()
+        scores = Ranker(manager, {'lab_clash': 1.0}).scores()
+        results.append((list(scores), ScheduleIndex(manager).sync().busy['lab']))
+    assert results[0] == results[1]
+    assert results[0][1]
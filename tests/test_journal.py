@@ -0,0 +1,72 @@
+import json
+
+import pytest
+
+from benchmarks.synthetic import generate
+from models.candidate import CandidateManager
+from services.journal import Journal, StateLoad
+from services.persistence import save_state
+
+
+def imported(count=200, compact=True):
+    manager = CandidateManager(compact=compact)
+    manager.begin_import()
+    manager.append_candidates(generate(count))
+    manager.finish_import()
+    return manager
+
+
+def crash(journal):
+    # The writer gets through what it was handed, then the process dies:
+    # no final snapshot and no orders written on close
+    journal.queue.put(('stop', None, None))
+    journal.thread.join()
+
+
+def test_edits_after_a_crash_are_replayed(tmp_path):
+    manager = imported()
+    journal = Journal(str(tmp_path / 'state.json'), compact_every=7)
+    journal.attach(manager)
+    ids = list(manager.table.index)
+    for i in range(10):
+        manager.score_many(ids[i * 3:i * 3 + 3], float(i))
+    manager.move(ids[:4], 'Hire')
+    manager.move(ids[4:6], 'Dismissed')
+    manager.move(ids[1:2], 'Available')
+    manager.sort_bucket('Available', ['Current CGPA'], [False])
+    manager.score_many([ids[0], ids[40]], [9.5, 4.0])
+    crash(journal)
+
+    loaded = CandidateManager(compact=True)
+    Journal(str(tmp_path / 'state.json')).load(loaded)
+    assert {bucket: list(members) for bucket, members in loaded.members.items()} == \
+           {bucket: list(members) for bucket, members in manager.members.items()}
+    def edits(manager):
+        # Saved tables are in bucket order
+        columns = manager.table[['Interview Score', 'Decision', 'Status']]
+        return manager.expanded(columns).astype(str).sort_index()
+
+    assert edits(loaded).equals(edits(manager))
+
+
+@pytest.mark.parametrize('damage', ['truncated', 'bad entry'])
+def test_failed_load_leaves_the_state_untouched(tmp_path, damage):
+    state = tmp_path / 'state.json'
+    save_state(imported(), str(state))
+    journal = Journal(str(state))
+    if damage == 'truncated':
+        state.write_bytes(state.read_bytes()[:len(state.read_bytes()) // 2])
+    else:
+        with open(journal.path, 'w') as f:
+            f.write(json.dumps({'op': 'order', 'bucket': 'No such bucket', 'ids': []}) + '\n')
+    files = [state, tmp_path / 'state.json.journal']
+    before = [path.read_bytes() if path.exists() else None for path in files]
+
+    load = StateLoad(journal, compact=True).start()
+    load.thread.join()
+    [(kind, _)] = load.poll()
+    journal.close()
+
+    assert kind == 'error'
+    assert journal.manager is None
+    assert [path.read_bytes() if path.exists() else None for path in files] == before
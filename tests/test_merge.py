@@ -0,0 +1,89 @@
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import generate
+from models.candidate import CSV_DTYPES, CandidateManager
+from services.journal import Journal
+from services.persistence import save_state
+
+
+def import_csv(manager, path):
+    manager.begin_import()
+    for chunk in pd.read_csv(path, chunksize=20, dtype=CSV_DTYPES):
+        manager.append_candidates(chunk)
+    manager.finish_import()
+
+
+@pytest.mark.parametrize('compact', [False, True])
+def test_merge_into_json_loaded_session(tmp_path, compact):
+    # Numeric roll numbers in the first export; the newer one has a dashed
+    # roll number, a blank one and an edited answer
+    first = generate(50)
+    first.to_csv(tmp_path / 'first.csv', index=False)
+    newer = generate(50)
+    newer.loc[3, 'Roll number'] = '2028-10-0374'
+    newer.loc[4, 'Roll number'] = None
+    newer.loc[5, 'Full name'] = 'Changed Name'
+    newer.to_csv(tmp_path / 'newer.csv', index=False)
+
+    manager = CandidateManager(compact=compact)
+    import_csv(manager, tmp_path / 'first.csv')
+    manager.score_many([str(first.loc[5, 'Roll number'])], 7.0)
+    state = str(tmp_path / 'state.json')
+    save_state(manager, state)
+
+    loaded = CandidateManager(compact=compact)
+    Journal(state).load(loaded)
+    counts = loaded.merge_candidates(pd.read_csv(tmp_path / 'newer.csv', dtype=CSV_DTYPES))
+    loaded.finish_import()
+
+    assert counts == {'added': 2, 'updated': 1, 'unchanged': 47}
+    row = loaded.details(str(newer.loc[5, 'Roll number']))
+    assert row['Full name'] == 'Changed Name'
+    assert float(row['Interview Score']) == 7.0
+    assert '2028-10-0374' in loaded.table.index
+
+
+def test_repeated_merges_keep_edited_answers():
+    # Previews of the generator's answers repeat; a later merge must still
+    # replace what the text store holds
+    from benchmarks.synthetic import WHY
+    manager = CandidateManager(compact=True)
+    manager.begin_import()
+    manager.append_candidates(generate(400))
+    manager.finish_import()
+    newer = generate(400)
+    newer['Timestamp'] = '01/09/2025 10:00:00'
+    newer.loc[1, WHY] = 'A brand new long answer ' * 5
+    for _ in range(2):
+        manager.merge_candidates(newer.copy())
+        manager.finish_import()
+    newest = newer.copy()
+    newest['Timestamp'] = '02/09/2025 10:00:00'
+    newest.loc[0, WHY] = 'Another new long answer here ' * 4
+    newest.loc[1, WHY] = 'Short again.'
+    manager.merge_candidates(newest)
+    manager.finish_import()
+
+    assert manager.details(str(newer.loc[0, 'Roll number']))[WHY] == newest.loc[0, WHY]
+    assert manager.details(str(newer.loc[1, 'Roll number']))[WHY] == 'Short again.'
+
+
+def test_merged_rows_stay_in_answer_search():
+    # Categorical columns of a compact table (the major here) are read in
+    # full by the already-built index
+    first = generate(100)
+    manager = CandidateManager(compact=True)
+    manager.begin_import()
+    manager.append_candidates(first)
+    manager.finish_import()
+    roll = str(first.loc[first['If you have declared a major, please specify'].str.contains('Computer Science', na=False)]
+               .iloc[0]['Roll number'])
+    assert roll in dict(manager.fulltext_search('computer science'))
+    newer = first.copy()
+    newer.loc[newer['Roll number'] == roll, 'Full name'] = 'Changed Name'
+    assert manager.merge_candidates(newer)['updated'] == 1
+    manager.finish_import()
+
+    assert roll in dict(manager.fulltext_search('computer science'))
+    assert manager.search('changed name') == {roll}
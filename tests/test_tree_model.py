@@ -0,0 +1,26 @@
+from benchmarks.synthetic import generate
+from gui.tree_model import frame_rows
+from models.candidate import CandidateManager
+from models.compact import PREVIEW
+
+
+def test_compact_frames_display_like_plain_ones():
+    df = generate(200)
+    frames = []
+    for compact in (False, True):
+        manager = CandidateManager(compact=compact)
+        manager.begin_import()
+        manager.append_candidates(df)
+        manager.finish_import()
+        ids = list(manager.table.index)
+        manager.score_many(ids[:50], 7.3)
+        manager.score_many(ids[50:60], 9.0)
+        manager.move(ids[:30], 'Hire')
+        frames.append(manager.table.loc[ids])
+    plain, compact = (frame_rows(frame) for frame in frames)
+    # Long answers show a preview in compact mode; everything else matches
+    def previews(rows):
+        return [tuple(value[:PREVIEW] for value in row) for row in rows]
+
+    assert previews(compact) == previews(plain)
+    assert any('3.99' in row or '7.3' in row for row in compact)
@@ -0,0 +1,158 @@
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+# Timing spans and counters for the hot paths. Off unless TA_TRACE is set:
+#
+#     TA_TRACE=1 python app.py              # last operation in the status bar
+#     TA_TRACE=trace.json python app.py     # ... and the session trace on exit
+#
+# The trace is in Chrome's trace event format (chrome://tracing, Perfetto).
+# Disabled, span() returns a shared no-op and timed functions cost one
+# attribute check per call.
+TRACE_ENV = 'TA_TRACE'
+MAX_EVENTS = 100000
+
+
+class Recorder:
+    def __init__(self):
+        self.enabled = False
+        self.path = None
+        self.events = deque(maxlen=MAX_EVENTS)
+        self.totals = {}
+        # (name, seconds, counts) of the last finished outermost span
+        self.last = None
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.origin = time.perf_counter()
+
+    def stack(self):
+        stack = getattr(self.local, 'stack', None)
+        if stack is None:
+            stack = self.local.stack = []
+        return stack
+
+
+RECORDER = Recorder()
+
+
+class NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_SPAN = NullSpan()
+
+
+class Span:
+    def __init__(self, name):
+        self.name = name
+        self.counts = {}
+        self.start = None
+
+    def __enter__(self):
+        RECORDER.stack().append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter()
+        stack = RECORDER.stack()
+        stack.pop()
+        if stack:
+            # Outer spans report everything counted inside them
+            parent = stack[-1].counts
+            for name, value in self.counts.items():
+                parent[name] = parent.get(name, 0) + value
+        else:
+            RECORDER.last = (self.name, end - self.start, dict(self.counts))
+        RECORDER.events.append({
+            'name': self.name, 'ph': 'X', 'pid': os.getpid(), 'tid': threading.get_ident(),
+            'ts': round((self.start - RECORDER.origin) * 1e6, 1), 'dur': round((end - self.start) * 1e6, 1),
+            'args': dict(self.counts),
+        })
+        return False
+
+
+def span(name):
+    if not RECORDER.enabled:
+        return NULL_SPAN
+    return Span(name)
+
+
+def timed(name):
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not RECORDER.enabled:
+                return func(*args, **kwargs)
+            with Span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def record(name, seconds, counts=None):
+    # A span timed by the caller, for work that spans several callbacks
+    if not RECORDER.enabled:
+        return
+    counts = dict(counts or {})
+    RECORDER.last = (name, seconds, counts)
+    start = time.perf_counter() - seconds
+    RECORDER.events.append({
+        'name': name, 'ph': 'X', 'pid': os.getpid(), 'tid': threading.get_ident(),
+        'ts': round((start - RECORDER.origin) * 1e6, 1), 'dur': round(seconds * 1e6, 1), 'args': counts,
+    })
+
+
+def count(name, value=1):
+    if not RECORDER.enabled:
+        return
+    stack = RECORDER.stack()
+    if stack:
+        counts = stack[-1].counts
+        counts[name] = counts.get(name, 0) + value
+    with RECORDER.lock:
+        RECORDER.totals[name] = RECORDER.totals.get(name, 0) + value
+
+
+def enabled():
+    return RECORDER.enabled
+
+
+def last():
+    return RECORDER.last
+
+
+def describe(entry):
+    name, seconds, counts = entry
+    parts = [f"{name} {seconds * 1000:.1f} ms"]
+    parts.extend(f"{key.replace('_', ' ')} {value:,}" for key, value in sorted(counts.items()))
+    return ' · '.join(parts)
+
+
+def configure(setting):
+    # '' / '0' off, '1' on, anything else on with the trace written there
+    RECORDER.enabled = bool(setting) and setting != '0'
+    RECORDER.path = setting if RECORDER.enabled and setting != '1' else None
+
+
+def dump(path=None):
+    path = path or RECORDER.path
+    if not path:
+        return
+    with RECORDER.lock:
+        trace = {'traceEvents': list(RECORDER.events), 'counters': dict(RECORDER.totals)}
+    with open(path, 'w') as f:
+        json.dump(trace, f)
+
+
+configure(os.environ.get(TRACE_ENV, ''))
+atexit.register(dump)